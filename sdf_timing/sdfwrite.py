@@ -17,284 +17,280 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import StringIO
+
+
+# Fixed SDF scaffolding used by `emit_sdf`. Each fragment carries its own
+# indentation and, except for the file header (which opens the output and
+# ends with a newline instead), starts with a newline.
+_DELAYFILE_HDR = "(DELAYFILE\n    (SDFVERSION \"3.0\")\n    (TIMESCALE {})\n"
+_DELAYFILE_END = "\n)"
+_CELL_HDR = "\n    (CELL\n        (CELLTYPE \"{}\")"
+_INSTANCE = "\n        (INSTANCE {})"
+_CELL_END = "\n    )"
+_DELAY_HDR = "\n        (DELAY"
+_ABSOLUTE_HDR = "\n            (ABSOLUTE"
+_INCREMENT_HDR = "\n            (INCREMENT"
+_DELAY_SECTION_END = "\n            )"
+_TIMINGCHECK_HDR = "\n        (TIMINGCHECK"
+_TIMINGENV_HDR = "\n        (TIMINGENV"
+_CELL_SECTION_END = "\n        )"
+_ENTRY = "\n                "
+
+
+def _format_triplet(mn, av, mx):
+    # missing values of a triplet are left empty
+    return (f"({'' if mn is None else mn}:{'' if av is None else av}"
+            f":{'' if mx is None else mx})")
+
+
+# Large SDFs repeat the same few delay triplets over and over, so their
+# formatting is memoized. `typed` keeps e.g. `1` and `1.0` apart, while
+# zeros (and missing values) bypass the cache as `0.0` and `-0.0` compare
+# equal.
+_format_triplet_cached = lru_cache(
+    maxsize=1 << 16, typed=True)(_format_triplet)
+
 
 def gen_timing_entry(entry):
 
     if 'all' in entry:
-        if entry['all'] is None: return "()";
-    elif entry['min'] is None and entry['avg'] is None\
-            and entry['max'] is None:
+        value = entry['all']
+        return "()" if value is None else f"({value})"
+
+    mn, av, mx = entry['min'], entry['avg'], entry['max']
+    if mn and av and mx:
+        return _format_triplet_cached(mn, av, mx)
+
+    if mn is None and av is None and mx is None:
         # if all the values are None return empty timing
         return "()"
 
-    if 'all' in entry:
-        return "(" + str(entry['all']) + ")";
-    else:
-        return "({MIN}:{AVG}:{MAX})".format(
-            MIN=entry['min'],
-            AVG=entry['avg'],
-            MAX=entry['max'])
+    return _format_triplet(mn, av, mx)
 
 
 def emit_timingenv_entries(delays):
 
-    entries = ""
-    tenv_entries = ""
-    for delay in sorted(delays):
-        delay = delays[delay]
-        entry = ""
-        if not delay['is_timing_env']:
-            # handle only timing_env here
-            continue
-
-        input_str = ""
-        output_str = ""
-        if delay['to_pin_edge'] is not None:
-            output_str = "(" + delay['to_pin_edge'] + " "\
-                + delay['to_pin'] + ")"
-        else:
-            output_str = delay['to_pin']
+    entries = []
+    for _name, delay in delays:
+        output_str = format_pin(delay['to_pin'], delay['to_pin_edge'])
+        input_str = format_pin(delay['from_pin'], delay['from_pin_edge'])
+        dp = delay['delay_paths']
 
-        if delay['from_pin_edge'] is not None:
-            input_str = "(" + delay['from_pin_edge'] + " "\
-                + delay['from_pin'] + ")"
-        else:
-            input_str = delay['from_pin']
+        rise_str = gen_timing_entry(dp['rise'])
+        fall_str = gen_timing_entry(dp['fall'])
+        entries.append(
+            f"{_ENTRY}(PATHCONSTRAINT {output_str} {input_str}"
+            f" {rise_str} {fall_str})")
 
-        entry += """
-                (PATHCONSTRAINT {output} {input} {RISE} {FALL})""".format(
-            output=output_str,
-            input=input_str,
-            RISE=gen_timing_entry(delay['delay_paths']['rise']),
-            FALL=gen_timing_entry(delay['delay_paths']['fall']))
-        entries += entry
+    if not entries:
+        return ""
 
-    if entries != "":
-        tenv_entries += """
-        (TIMINGENV"""
-        tenv_entries += entries
-        tenv_entries += """
-        )"""
+    return "".join([_TIMINGENV_HDR] + entries + [_CELL_SECTION_END])
 
-    return tenv_entries
 
+# Timing checks carrying a pair of setup and hold limits (all others carry
+# a single, nominal limit).
+_TCHECK_SETUP_HOLD = frozenset(('setuphold', 'recrem', 'nochange'))
 
-def emit_timingcheck_entries(delays):
 
-    entries = ""
-    tcheck_entries = ""
-    for delay in sorted(delays):
-        delay = delays[delay]
-        entry = ""
-        if not delay['is_timing_check']:
-            # handle only timing checks here
-            continue
-
-        input_str = ""
-        output_str = ""
-        if delay['to_pin_edge'] is not None:
-            output_str = "(" + delay['to_pin_edge'] + " "\
-                + delay['to_pin'] + ")"
-        else:
-            output_str = delay['to_pin']
+def emit_timingcheck_entries(delays):
 
-        if delay['from_pin_edge'] is not None:
-            input_str = "(" + delay['from_pin_edge'] + " "\
-                + delay['from_pin'] + ")"
-        else:
-            input_str = delay['from_pin']
+    entries = []
+    for _name, delay in delays:
+        output_str = format_pin(delay['to_pin'], delay['to_pin_edge'])
+        input_str = format_pin(delay['from_pin'], delay['from_pin_edge'])
+        dp = delay['delay_paths']
 
         if delay['is_cond']:
-            input_str = "(COND {equation} {input})".format(
-                equation=delay['cond_equation'],
-                input=input_str)
+            input_str = f"(COND {delay['cond_equation']} {input_str})"
 
-        if delay['name'].startswith("width"):
+        dtype = delay['type']
+        if dtype == "width":
             output_str = ""
 
-        if delay['name'].startswith("setuphold"):
-            entry += """
-                ({type} {output} {input} {SETUP} {HOLD})""".format(
-                type=delay['type'].upper(),
-                input=input_str,
-                output=output_str,
-                SETUP=gen_timing_entry(delay['delay_paths']['setup']),
-                HOLD=gen_timing_entry(delay['delay_paths']['hold']))
+        type_str = dtype.upper()
+        if dtype in _TCHECK_SETUP_HOLD:
+            setup_str = gen_timing_entry(dp['setup'])
+            hold_str = gen_timing_entry(dp['hold'])
+            entries.append(
+                f"{_ENTRY}({type_str} {output_str} {input_str}"
+                f" {setup_str} {hold_str})")
 
         else:
-            entry += """
-                ({type} {output} {input} {NOMINAL})""".format(
-                type=delay['type'].upper(),
-                input=input_str,
-                output=output_str,
-                NOMINAL=gen_timing_entry(delay['delay_paths']['nominal']))
-        entries += entry
+            nominal_str = gen_timing_entry(dp['nominal'])
+            entries.append(
+                f"{_ENTRY}({type_str} {output_str} {input_str}"
+                f" {nominal_str})")
+
+    if not entries:
+        return ""
+
+    return "".join([_TIMINGCHECK_HDR] + entries + [_CELL_SECTION_END])
+
+
+def _emit_port(delay, input_str, output_str, tim_val_str):
+    return f"{_ENTRY}(PORT {input_str} {tim_val_str})"
+
+
+def _emit_interconnect(delay, input_str, output_str, tim_val_str):
+    return f"{_ENTRY}(INTERCONNECT {input_str} {output_str} {tim_val_str})"
+
+
+def _emit_device(delay, input_str, output_str, tim_val_str):
+    return f"{_ENTRY}(DEVICE {input_str} {tim_val_str})"
+
+
+def _emit_iopath(delay, input_str, output_str, tim_val_str):
+
+    retain_str = ''
+    if 'retain_paths' in delay:
+        retain_vals = "".join(
+            [gen_timing_entry(delval) for delval in delay['retain_paths']])
+        retain_str = f"(RETAIN {retain_vals}) "
+
+    if delay['is_cond']:
+        return (f"{_ENTRY}(COND ({delay['cond_equation']})"
+                f"{_ENTRY}     (IOPATH {input_str} {output_str}"
+                f" {retain_str}{tim_val_str})"
+                f"{_ENTRY})")
+
+    return (f"{_ENTRY}(IOPATH {input_str} {output_str}"
+            f" {retain_str}{tim_val_str})")
 
-    if entries != "":
-        tcheck_entries += """
-        (TIMINGCHECK"""
-        tcheck_entries += entries
-        tcheck_entries += """
-        )"""
 
-    return tcheck_entries
+# Maps a delay `type` onto the function formatting its entry. Any other
+# type is formatted as IOPATH.
+_DELAY_EMITTERS = {
+    'port': _emit_port,
+    'interconnect': _emit_interconnect,
+    'device': _emit_device,
+}
 
 
 def emit_delay_entries(delays):
 
-    entries_absolute = ""
-    entries_incremental = ""
-    entries = ""
-
-    for delay in sorted(delays):
-        entry = ""
-        delay = delays[delay]
-        if not delay['is_absolute'] and not delay['is_incremental']:
-            # if it's neiter absolute, nor incremental
-            # it must be a timingcheck entry. It will be
-            # handled later
-            continue
-
-        input_str = ""
-        output_str = ""
-        if delay['to_pin_edge'] is not None:
-            output_str = "(" + delay['to_pin_edge'] + " "\
-                + delay['to_pin'] + ")"
-        else:
-            output_str = delay['to_pin']
+    abs_parts = []
+    inc_parts = []
 
-        if delay['from_pin_edge'] is not None:
-            input_str = "(" + delay['from_pin_edge'] + " "\
-                + delay['from_pin'] + ")"
-        else:
-            input_str = delay['from_pin']
-
-        tim_val_str = ""
-        for delval in delay['delay_paths']:
-            tim_val_str += gen_timing_entry(delval)
-
-        indent = ""
-        if delay['type'].startswith("port"):
-            entry += """
-                (PORT {input} {timval})""".format(
-                input=input_str,
-                timval=tim_val_str)
-        elif delay['type'].startswith("interconnect"):
-            entry += """
-                (INTERCONNECT {input} {output} {timval})""".format(
-                input=input_str,
-                output=output_str,
-                timval=tim_val_str)
-        elif delay['type'].startswith("device"):
-            entry += """
-                (DEVICE {input} {timval})""".format(
-                input=input_str,
-                timval=tim_val_str)
-        else:
-            if delay['is_cond']:
-                indent = "     "
-                entry += """
-                (COND ({equation})""".format(
-                    equation=delay['cond_equation'])
-
-            retain_str = '';
-            if 'retain_paths' in delay:
-                for delval in delay['retain_paths']:
-                    retain_str += gen_timing_entry(delval)
-                retain_str = "(RETAIN " + retain_str + ") ";
-
-            entry += """
-                {indent}(IOPATH {input} {output} {retain}{timval})""".format(
-                indent=indent,
-                input=input_str,
-                output=output_str,
-                retain=retain_str,
-                timval=tim_val_str)
-
-            if delay['is_cond']:
-                entry += """
-                )"""
-
-        if delay['is_absolute']:
-            entries_absolute += entry
-            # if it is not absolute it must be incremental
-            # all the other types are filtered above
-        else:
-            entries_incremental += entry
-
-    if entries_absolute != "" or entries_incremental != "":
-        entries += """
-        (DELAY"""
-    if entries_absolute != "":
-        entries += """
-            (ABSOLUTE"""
-        entries += entries_absolute
-        entries += """
-            )"""
-    if entries_incremental != "":
-        entries += """
-            (INCREMENT"""
-        entries += entries_incremental
-        entries += """
-            )"""
-    if entries_absolute != "" or entries_incremental != "":
-        entries += """
-        )"""
-
-    return entries
+    for _name, delay in delays:
+        # absolute and incremental entries go to separate sections
+        parts = abs_parts if delay['is_absolute'] else inc_parts
+
+        output_str = format_pin(delay['to_pin'], delay['to_pin_edge'])
+        input_str = format_pin(delay['from_pin'], delay['from_pin_edge'])
+        dp = delay['delay_paths']
+
+        tim_val_str = "".join([gen_timing_entry(delval) for delval in dp])
+
+        emitter = _DELAY_EMITTERS.get(delay['type'], _emit_iopath)
+        parts.append(emitter(delay, input_str, output_str, tim_val_str))
+
+    if not abs_parts and not inc_parts:
+        return ""
+
+    out_parts = [_DELAY_HDR]
+    if abs_parts:
+        out_parts.append(_ABSOLUTE_HDR)
+        out_parts.extend(abs_parts)
+        out_parts.append(_DELAY_SECTION_END)
+    if inc_parts:
+        out_parts.append(_INCREMENT_HDR)
+        out_parts.extend(inc_parts)
+        out_parts.append(_DELAY_SECTION_END)
+    out_parts.append(_CELL_SECTION_END)
+
+    return "".join(out_parts)
+
+
+# Splits a cell's `delays` dictionary into lists of `(name, delay)` pairs,
+# sorted by name, for the `emit_delay_entries` (absolute and incremental
+# delays), `emit_timingcheck_entries` and `emit_timingenv_entries` emitters.
+def partition_delays(delays):
+
+    dels = []
+    checks = []
+    envs = []
+    for item in sorted(delays.items()):
+        delay = item[1]
+        if delay['is_absolute'] or delay['is_incremental']:
+            dels.append(item)
+        elif delay['is_timing_check']:
+            checks.append(item)
+        elif delay['is_timing_env']:
+            envs.append(item)
+
+    return dels, checks, envs
+
+
+# Generates the SDF text for `timings` as a sequence of fragments: the
+# DELAYFILE header, one fragment per cell instance and the closing bracket.
+# Joining the fragments yields the same text as `emit_sdf`; iterating them
+# lets callers consume the output incrementally.
+def iter_sdf(timings, timescale='1ps', uppercase_celltype=False):
+
+    yield _DELAYFILE_HDR.format(timescale)
+
+    if 'cells' in timings:
+        cells = dict()
+        for cell in timings['cells']:
+            cellname = cell['cell']
+            instname = cell['inst']
+            if cellname not in cells:
+                cells[cellname] = dict()
+            if instname not in cells[cellname]:
+                cells[cellname][instname] = dict()
+
+            if 'delays' in cell:
+                cells[cellname][instname].update(cell['delays'])
+                # for  in cell['delays']:
+                #    cells[cellname][instname][delay['name']] = delay
+
+        for cell, locations in sorted(cells.items()):
+            for location, delays in sorted(locations.items()):
+
+                if uppercase_celltype:
+                    celltype = cell.upper()
+                else:
+                    celltype = cell
+
+                cell_parts = [
+                    _CELL_HDR.format(celltype),
+                    _INSTANCE.format(
+                        location if location is not None else "")]
+
+                # most cells have no timing checks or timing env entries,
+                # so skip the emitters for empty partitions altogether
+                dels, checks, envs = partition_delays(delays)
+                if dels:
+                    cell_parts.append(emit_delay_entries(dels))
+                if checks:
+                    cell_parts.append(emit_timingcheck_entries(checks))
+                if envs:
+                    cell_parts.append(emit_timingenv_entries(envs))
+                cell_parts.append(_CELL_END)
+
+                yield "".join(cell_parts)
+
+    yield _DELAYFILE_END
+
+
+# Writes the SDF text for `timings` into a text stream `out`, one cell
+# instance at a time, so the full output never has to be held in memory.
+def emit_sdf_to_stream(timings, out, timescale='1ps',
+                       uppercase_celltype=False):
+
+    for fragment in iter_sdf(timings, timescale, uppercase_celltype):
+        out.write(fragment)
 
 
 def emit_sdf(timings, timescale='1ps', uppercase_celltype=False):
 
-    for slice in timings:
-        sdf = \
-            """(DELAYFILE
-    (SDFVERSION \"3.0\")
-    (TIMESCALE {})
-""".format(timescale)
-        if 'cells' in timings:
-            cells = dict();
-            for cell in timings['cells']:
-                cellname = cell['cell'];
-                instname = cell['inst'];
-                if cellname not in cells:
-                    cells[cellname] = dict();
-                if instname not in cells[cellname]:
-                    cells[cellname][instname] = dict();
-
-                if 'delays' in cell:
-                    cells[cellname][instname].update( cell['delays'] );
-                    #for  in cell['delays']:
-                    #    cells[cellname][instname][delay['name']] = delay
-
-            for cell in sorted(cells):
-                for location in sorted(cells[cell]):
-
-                    if uppercase_celltype:
-                        celltype = cell.upper()
-                    else:
-                        celltype = cell
-
-                    sdf += """
-    (CELL
-        (CELLTYPE \"{name}\")""".format(name=celltype)
-
-                    sdf += """
-        (INSTANCE {location})""".format(location=location)
-                    sdf += emit_delay_entries(
-                        cells[cell][location])
-                    sdf += emit_timingcheck_entries(
-                        cells[cell][location])
-                    sdf += emit_timingenv_entries(
-                        cells[cell][location])
-                    sdf += """
-    )"""
-        sdf += """
-)"""
-
-    # fix "None" entries
-    sdf = sdf.replace("None", "")
-    return sdf
+    buf = StringIO()
+    emit_sdf_to_stream(timings, buf, timescale, uppercase_celltype)
+    return buf.getvalue()
 
 import os
 import sys
@@ -303,6 +299,16 @@ import re
 from ply import yacc
 from sdf_timing import sdfparse, sdfyacc, sdflex
 
+# Splits a TIMESCALE header value (e.g. `10ps`) into the number and the unit.
+_TIMESCALE_RE = re.compile(r'^(\d+)(\D+)$')
+
+# Record types grouped by the SDF section they get printed into.
+_DELAY_KINDS = frozenset(('interconnect', 'iopath', 'port', 'device'))
+_TCHECK_KINDS = frozenset(('setup', 'hold', 'setuphold', 'recovery',
+                           'removal', 'recrem', 'width', 'period',
+                           'nochange'))
+_TENV_KINDS = frozenset(('pathconstraint',))
+
 def parse(input):
     sdfparse.init()
     sdflex.input_data = input
@@ -339,11 +345,15 @@ def format_triplet(entry):
 
 def print_timing_record(rec, indent):
     if rec is None or not 'type' in rec:
-        pass
+        return
 
 
-def print_sdf(sdfdata, indent="  ", channel=sys.stdout):
-    print("(DELAYFILE", file=channel);
+def print_sdf(sdfdata, indent="  ", channel=None):
+    # The output is collected into a list of lines and written out at once
+    # to avoid the overhead of one print() call per line.
+    if channel is None:
+        channel = sys.stdout
+    lines = ["(DELAYFILE"]
 
     for k,v in sdfdata['header'].items():
         if k == "voltage" or k == 'temperature':
@@ -351,83 +361,95 @@ def print_sdf(sdfdata, indent="  ", channel=sys.stdout):
         elif k == 'divider':
             pass
         elif k == 'timescale':
-            m = re.match('^(\d+)(\D+)$',v);
+            m = _TIMESCALE_RE.match(v)
             v = m.group(1) + ' ' + m.group(2);
         else:
             v = '\"' + v + '\"';
-        print( indent + "({key} {value})".format(key=k.upper(), value=v), file=channel );
+        lines.append(indent + "({key} {value})".format(key=k.upper(), value=v))
 
     if 'cells' in sdfdata:
         for instdata in sdfdata['cells']:
-            print(indent + "(CELL", file=channel);
-            print( indent*2 + "(CELLTYPE \"{}\")".format(instdata['cell']), file=channel );
+            lines.append(indent + "(CELL")
+            lines.append(
+                indent * 2 + "(CELLTYPE \"{}\")".format(instdata['cell']))
             inst = instdata['inst'] if 'inst' in instdata else None;
-            print( indent*2 + "(INSTANCE {})".format(inst if inst is not None else ''), file=channel );
+            lines.append(indent * 2 + "(INSTANCE {})".format(
+                inst if inst is not None else ''))
 
             if 'delays' in instdata:
                 last_rectype = None;
                 rectype = None;
                 for rec,recdata in instdata['delays'].items():
-                    if any(recdata['type'] in s for s in ['interconnect', 'iopath', 'port', 'device']):
+                    rtype = recdata['type']
+                    if rtype in _DELAY_KINDS:
                         rectype = "absdelay" if recdata['is_absolute'] else "incdelay";
-                    elif any(recdata['type'] in s for s in ['setup', 'hold', 'setuphold', 'recovery', 'removal',
-                        'recrem', 'width', 'period', 'nochange']):
+                    elif rtype in _TCHECK_KINDS:
                         rectype = 'tcheck';
-                    elif any(recdata['type'] in s for s in ['pathconstraint']):
+                    elif rtype in _TENV_KINDS:
                         rectype = 'tenv';
                     else:
                         rectype = None
 
                     if rectype != last_rectype:
-                        print_closing_bracket(last_rectype, indent, channel);
-                        print_opening_bracket(rectype, indent, channel);
+                        lines.extend(
+                            format_closing_bracket(last_rectype, indent))
+                        lines.extend(
+                            format_opening_bracket(rectype, indent))
 
                     if rectype=='absdelay' or rectype=='incdelay':
-                        print( 4*indent + format_delay(recdata), file=channel );
+                        lines.append(4 * indent + format_delay(recdata))
                     elif rectype=='tcheck':
-                        print( 3*indent + format_tcheck(recdata), file=channel );
+                        lines.append(3 * indent + format_tcheck(recdata))
                     elif rectype=='tenv':
-                        print( 3*indent + format_tenv(recdata), file=channel );
+                        lines.append(3 * indent + format_tenv(recdata))
                     else:
                         raise Exception('Wrongly detected record type!', recdata, rectype)
 
                     last_rectype = rectype;
 
-                print_closing_bracket(last_rectype, indent, channel);
+                lines.extend(format_closing_bracket(last_rectype, indent))
 
-            print(indent + ")", file=channel);
-    print(")", end='', file=channel);
+            lines.append(indent + ")")
+    lines.append(")")
+    channel.write("\n".join(lines))
 
 
-def print_closing_bracket(rectype, indent, channel):
-    if rectype is None:
-        pass
-
+def format_closing_bracket(rectype, indent):
     if rectype == 'absdelay' or rectype == 'incdelay':
-        print(3*indent + ")\n" + 2*indent + ")", file=channel);
+        return [3 * indent + ")", 2 * indent + ")"]
     elif rectype == 'tcheck' or rectype == 'tenv':
-        print(2*indent + ")", file=channel);
-
+        return [2 * indent + ")"]
+    return []
 
-def print_opening_bracket(rectype, indent, channel):
-    if rectype is None:
-        pass
 
+def format_opening_bracket(rectype, indent):
     if rectype == 'absdelay' or rectype == 'incdelay':
-        print(2*indent + "(DELAY", file=channel);
-        print(3*indent + ("(ABSOLUTE" if rectype=='absdelay' else "(INCREMENT"), file=channel);
+        return [2 * indent + "(DELAY",
+                3 * indent + ("(ABSOLUTE" if rectype == 'absdelay'
+                              else "(INCREMENT")]
     elif rectype == 'tcheck':
-        print(2*indent + "(TIMINGCHECK", file=channel);
+        return [2 * indent + "(TIMINGCHECK"]
     elif rectype == 'tenv':
-        print(2*indent + "(TIMINGENV", file=channel);
+        return [2 * indent + "(TIMINGENV"]
+    return []
+
+
+def print_closing_bracket(rectype, indent, channel):
+    for line in format_closing_bracket(rectype, indent):
+        print(line, file=channel)
+
+
+def print_opening_bracket(rectype, indent, channel):
+    for line in format_opening_bracket(rectype, indent):
+        print(line, file=channel)
 
 
 def format_pin(pin, edge, conditional=False, condition=None):
     if edge is not None:
-        pin = "(" + edge + " " + pin + ")"
+        pin = f"({edge} {pin})"
 
     if conditional:
-        pin = '(COND ' + condition + ' ' + pin + ')'
+        pin = f"(COND {condition} {pin})"
 
     return pin
 
@@ -539,15 +561,30 @@ def format_tcheck(data):
     return entry;
 
 
-def print_sdf_file(f, indent='  ', channel=sys.stdout):
-    #print(f);
+def read_sdf_file(f):
     with open(f) as sdffile:
-        sdfdata = parse( sdffile.read() );
-        #print( json.dumps(sdfdata, indent=2) );
-        print_sdf( sdfdata, indent, channel );
+        return sdffile.read()
 
 
-def print_sdf_files(files, indent='  '):
-    for f in files:
-        print_sdf_file(f,indent);
+def print_sdf_file(f, indent='  ', channel=None):
+    # print(f);
+    sdfdata = parse(read_sdf_file(f))
+    # print( json.dumps(sdfdata, indent=2) );
+    print_sdf(sdfdata, indent, channel)
 
+
+# Prints the given SDF files one after another.
+#
+# The parser keeps global state and so the files are parsed sequentially,
+# but the next file gets read in a background thread while the current
+# one is being parsed and printed.
+def print_sdf_files(files, indent='  '):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = None
+        for f in files:
+            upcoming = executor.submit(read_sdf_file, f)
+            if pending is not None:
+                print_sdf(parse(pending.result()), indent)
+            pending = upcoming
+        if pending is not None:
+            print_sdf(parse(pending.result()), indent)
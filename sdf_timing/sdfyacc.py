@@ -17,6 +17,11 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import hashlib
+import os
+import shutil
+import sys
+
 import ply.yacc as yacc
 
 from . import utils
@@ -640,35 +645,35 @@ def p_real_triple_no_par(p):
                    | FLOAT COLON COLON
                    | FLOAT'''
 
-    delays_triple = dict()
-    if len(p) == 6:
-        delays_triple['min'] = float(p[1])
-        delays_triple['avg'] = float(p[3])
-        delays_triple['max'] = float(p[5])
+    # The values are fetched in one go; every `p[i]` and `len(p)` is a Python
+    # level call of the PLY production object, which shows on large SDFs.
+    v = p[1:]
+    n = len(v)
+    if n == 5:
+        delays_triple = {
+            'min': float(v[0]), 'avg': float(v[2]), 'max': float(v[4])}
 
-    elif len(p) == 5:
+    elif n == 4:
 
-        if p[1] == ':' and p[3] == ':':
-            delays_triple['min'] = None
-            delays_triple['avg'] = float(p[2])
-            delays_triple['max'] = float(p[4])
+        if v[0] == ':' and v[2] == ':':
+            delays_triple = {
+                'min': None, 'avg': float(v[1]), 'max': float(v[3])}
 
-        elif p[2] == ':' and p[3] == ':':
-            delays_triple['min'] = float(p[1])
-            delays_triple['avg'] = None
-            delays_triple['max'] = float(p[4])
+        elif v[1] == ':' and v[2] == ':':
+            delays_triple = {
+                'min': float(v[0]), 'avg': None, 'max': float(v[3])}
 
-        elif p[2] == ':' and p[4] == ':':
-            delays_triple['min'] = float(p[1])
-            delays_triple['avg'] = float(p[3])
-            delays_triple['max'] = None
+        else:
+            delays_triple = {
+                'min': float(v[0]), 'avg': float(v[2]), 'max': None}
 
-    elif len(p) == 4:
-        delays_triple['min'] = float(p[1]) if p[1] != ':' else None
-        delays_triple['avg'] = float(p[2]) if p[2] != ':' else None
-        delays_triple['max'] = float(p[3]) if p[3] != ':' else None
+    elif n == 3:
+        delays_triple = {
+            'min': float(v[0]) if v[0] != ':' else None,
+            'avg': float(v[1]) if v[1] != ':' else None,
+            'max': float(v[2]) if v[2] != ':' else None}
 
-    elif len(p) == 2:
+    elif n == 1:
         # Using `all` key instead of the `min`, `avg`, `max` triplet
         # keys. Using a different key makes it possible to differentiate if the input
         # was a single scalar value or a triplet and hence enables doing an identity
@@ -676,11 +681,11 @@ def p_real_triple_no_par(p):
         # triplet keys, one would need to either collapse an all-the-same
         # triplet to a single value, or expand a single value to an all-the-same
         # triplet, which may cause differences to the input, parsed syntax.
-        delays_triple['all'] = float(p[1]);
+        delays_triple = {'all': float(v[0])}
 
     else:
-        # Same comment as for the `len()==2` case.
-        delays_triple['all'] = None;
+        # Same comment as for the `n == 1` case.
+        delays_triple = {'all': None}
 
     p[0] = delays_triple
 
@@ -832,4 +837,88 @@ def p_error(p):
     raise Exception("Syntax error at '%s' line: %d" % (p.value, p.lineno))
 
 
-parser = yacc.yacc(debug=False, write_tables=False)
+# Returns the path of a pickle file in the user cache directory that holds
+# the parsing tables of this grammar, or None if the directory is not
+# usable. The name includes a hash of this module and the PLY version so that
+# different installations do not overwrite each other's tables. The directory
+# itself is only created once the tables get written (see `load_parser`).
+#
+# Unpickling runs arbitrary code, so the directory is only used if it is
+# owned by the current user and nobody else can write into it.
+def _user_cache_picklefile():
+    cachedir = os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+        'sdf_timing')
+    with open(__file__, 'rb') as f:
+        h = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    picklefile = os.path.join(cachedir,
+                              'parser-%s-ply%s.pkl' % (h, yacc.__version__))
+    try:
+        st = os.stat(cachedir)
+    except FileNotFoundError:
+        return picklefile
+    except OSError:
+        return None
+    if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+        return None
+    if st.st_mode & 0o022 or not os.access(cachedir, os.W_OK):
+        return None
+    return picklefile
+
+
+# Removes the file `path` if there is one.
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Returns the parser built by `yacc.yacc(**kwargs)`, keeping its tables in
+# the pickle file `picklefile` between runs (unless it is None).
+#
+# PLY writes the pickle in place and only tolerates a missing or outdated
+# file, so a file truncated by an interrupted (or concurrent) write would
+# break every later run. PLY is therefore given a private copy of the file
+# to read the tables from and to write new tables into, and the copy
+# atomically replaces the pickle file once PLY has rebuilt the tables. A copy
+# that fails to load is discarded and the tables get rebuilt.
+def load_parser(picklefile, **kwargs):
+    if picklefile is None:
+        return yacc.yacc(**kwargs)
+
+    tmpfile = '%s.%d.tmp' % (picklefile, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(picklefile), mode=0o700, exist_ok=True)
+        shutil.copyfile(picklefile, tmpfile)
+    except OSError:
+        _remove(tmpfile)
+
+    try:
+        try:
+            parser = yacc.yacc(picklefile=tmpfile, **kwargs)
+        except Exception:
+            # drop the damaged file right away, so that it is not kept even
+            # if rebuilding the tables fails too
+            _remove(tmpfile)
+            _remove(picklefile)
+            parser = yacc.yacc(picklefile=tmpfile, **kwargs)
+        # productions loaded from a pickle are `MiniProduction`s, so any
+        # other kind means that PLY has rebuilt (and written) the tables
+        if not isinstance(parser.productions[0], yacc.MiniProduction):
+            try:
+                os.replace(tmpfile, picklefile)
+            except OSError:
+                # PLY could not write the tables, do not keep a broken file
+                _remove(picklefile)
+    finally:
+        _remove(tmpfile)
+    return parser
+
+
+# The parsing tables are pickled into the user cache directory, so only the
+# first import pays for the LALR table generation (PLY rebuilds the tables
+# whenever the grammar changes). Nothing is written into the package
+# directory, which may be shared or read-only (e.g. site-packages).
+parser = load_parser(_user_cache_picklefile(), module=sys.modules[__name__],
+                     debug=False, write_tables=False)
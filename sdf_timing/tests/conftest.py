@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+# Copyright 2022 Tomas Brabec
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import sys
+
+# Adds the `sdf_timing` source tree, the command-line utilities next to it
+# (when testing a source tree) and this directory (for the test modules
+# importing shared helpers from each other) into PYTHONPATH, once for all
+# the test modules.
+_TESTS_DIR = os.path.dirname(__file__)
+for path in [os.path.join(_TESTS_DIR, '..', '..'),
+             os.path.join(_TESTS_DIR, '..', '..', 'utils'), _TESTS_DIR]:
+    path = os.path.normpath(os.path.abspath(path))
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -22,7 +22,7 @@ import os
 import os.path
 
 
-from sdf_timing import sdfparse
+from sdf_timing import sdfparse, sdfwrite
 
 
 __path__ = os.path.dirname(__file__)
@@ -48,6 +48,33 @@ def test_emit():
         generated_sdfs.append(sdfparse.emit(s))
 
 
+class RecordingStream:
+    """ Text stream keeping every written chunk separately"""
+
+    def __init__(self):
+        self.chunks = list()
+
+    def write(self, s):
+        self.chunks.append(s)
+
+
+def test_emit_to_stream():
+    """ Checks if SDF is streamed in chunks and matches the golden files"""
+    for s, f in zip(parsed_sdfs, input_file_names):
+        stream = RecordingStream()
+        sdfwrite.emit_sdf_to_stream(s, stream)
+        assert len(stream.chunks) > 1
+        with open(os.path.join(goldenfiles_path, f)) as sdffile:
+            assert ''.join(stream.chunks) == sdffile.read()
+
+
+def test_emit_no_cells():
+    """ Checks if timings without any cells emit an empty DELAYFILE"""
+    sdf = '(DELAYFILE\n    (SDFVERSION "3.0")\n    (TIMESCALE 1ps)\n\n)'
+    assert sdfparse.emit({}) == sdf
+    assert sdfparse.emit({'header': {}}) == sdf
+
+
 def test_output_stability():
     """ Checks if the generated SDF are identical with golden files"""
 
@@ -19,17 +19,18 @@
 
 import unittest
 import os
-import sys
 import re
 from io import StringIO
 
-# add `sdf_timing` source tree into PYTHONPATH
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-sys.path.append(os.path.dirname(__file__))
+# Running a test module directly (i.e. without pytest and `conftest.py`);
+# add the `sdf_timing` source tree into PYTHONPATH.
+if __name__ == '__main__':
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from sdf_timing import sdfparse, sdfyacc, sdflex, sdfwrite
-from ply import yacc
-from test_syntax_elements import NullLogger, reconfigure, parse
+from sdf_timing import sdfparse, sdfyacc, sdfwrite  # noqa: E402
+from ply import yacc  # noqa: E402
+from test_syntax_elements import _NULL_LOGGER, parse  # noqa: E402
 
 
 # Defines a data set to be tested. The structure is a list of records,
@@ -204,18 +205,31 @@ testdata = [
 ];
 
 
+# Matches a line break together with any surrounding whitespace (including
+# further line breaks, i.e. empty lines).
+_LINE_BREAK_WS = re.compile(r'\s*\n\s*')
+
 # Removes empty lines and trims leading and trailing whitespace from
 # a (generally multi-line) string.
 def trim_whitespace(string):
-    return "\n".join([l.strip() for l in string.splitlines() if l.strip()]);
+    return _LINE_BREAK_WS.sub('\n', string).strip();
 
 
 # Performs full SDF syntax tests by parsing an input syntax, writing it
 # out to a string buffer and comparing with the expected output.
 class TestParseAndWrite(unittest.TestCase):
 
+    # Builds the full SDF parser once for the whole test case (rebuilding
+    # the LALR tables is by far the most expensive part of the tests).
+    @classmethod
+    def setUpClass(cls):
+        cls._parser = yacc.yacc(debug=False, write_tables=False, module=sdfyacc, errorlog=_NULL_LOGGER);
+
     def setUp(self):
-        reconfigure(errorlog=NullLogger);
+        # other tests may have replaced the parser with one for a different
+        # start symbol, hence restore the shared one
+        sdfyacc.parser = self._parser;
+        sdfparse.init();
         self.buf = StringIO();
         self.maxDiff = None;
 
@@ -230,3 +244,6 @@ class TestParseAndWrite(unittest.TestCase):
                 act = trim_whitespace( self.buf.getvalue() );
                 self.assertEqual( act, exp );
 
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,34 +19,146 @@
 
 import unittest
 import os
-import sys
+import tempfile
+from unittest import mock
+from functools import lru_cache
+from operator import itemgetter
 
-# add `sdf_timing` source tree into PYTHONPATH
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+# Running a test module directly (i.e. without pytest and `conftest.py`);
+# add the `sdf_timing` source tree into PYTHONPATH.
+if __name__ == '__main__':
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from sdf_timing import sdfparse, sdfyacc, sdflex
-from ply import yacc
+from sdf_timing import sdfparse, sdfyacc, sdflex  # noqa: E402
 
 # Implements a "silent" PlyLogger. It is used to avoid various parser
 # errors and warnings on unused grammer symbols, which would get reported
 # once we start changing the parser's start symbol.
-class NullLogger(yacc.PlyLogger):
-    def debug(self, msg=None, *args, **kwargs):
+#
+# PLY only calls the logging methods, so no `yacc.PlyLogger` base (nor its
+# file handle) is needed.
+class NullLogger:
+    @staticmethod
+    def debug(*args, **kwargs):
         pass
 
     info = debug
     warning = debug
     error = debug
+    critical = debug
+
+# The one logger instance shared by all tests.
+_NULL_LOGGER = NullLogger()
+
+# Unless `SDF_TEST_FAST=0` is set in the environment, `reconfigure` ignores
+# any request for PLY debug output, table files or diagnostics (set it to
+# debug the grammar itself).
+_FAST = os.environ.get('SDF_TEST_FAST', '1') == '1';
+
+# Parsers compiled by `reconfigure`, keyed by `(startsym, debug, write_tables)`.
+_PARSER_CACHE = {};
+
+# Directories to keep the pickled parser tables between test runs, in the
+# order of preference (the user cache is for read-only source trees).
+_PICKLE_DIRS = (
+    os.path.join(os.path.dirname(__file__), '.cache'),
+    os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+        'sdf_timing', 'tests'),
+)
+
+
+# Returns True if `cachedir` exists (or could be created) and only the
+# current user can write into it. Unpickling runs arbitrary code, so the
+# tables must not come from a directory that someone else could plant a
+# file in.
+def is_private_dir(cachedir):
+    try:
+        os.makedirs(cachedir, mode=0o700, exist_ok=True)
+        st = os.stat(cachedir)
+    except OSError:
+        return False
+    if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+        return False
+    if st.st_mode & 0o022:
+        return False
+    return os.access(cachedir, os.W_OK)
+
+
+# Returns the pickle file for the parser tables of a given start symbol
+# (or `None` if no cache directory is usable).
+#
+# PLY checks the pickled tables against the grammar signature (which
+# includes the start symbol and all grammar rules) and rebuilds them
+# whenever `sdfyacc` changes, hence a stale file never gets used. The file
+# is read and written by `sdfyacc.load_parser`, which replaces it atomically
+# and rebuilds the tables of a file that fails to load (e.g. one truncated
+# by an interrupted test run).
+def pickle_file(startsym):
+    for cachedir in _PICKLE_DIRS:
+        if is_private_dir(cachedir):
+            return os.path.join(cachedir, 'parser_{}.pkl'.format(
+                startsym or 'delay_file'))
+    return None
 
 # Compiles a new parser with the given configuration.
 #
 # Unfortunately, `sdf_timing` current API supports no customization
 # and, in genetral, is very stiff. Unless that changes, we do need
 # to tap its internals for any customization.
+#
+# Compiling the LALR tables is by far the most expensive part of a test,
+# and so every configuration gets compiled only once and then reused.
+#
+# Unless asked otherwise, no parser tables (`parsetab.py`) nor debug files
+# (`parser.out`) get written and PLY diagnostics are silenced. The tables
+# are pickled instead to speed up the next test run.
 def reconfigure(debug=False,write_tables=False,startsym=None, errorlog=None, debuglog=None):
-    sdfyacc.parser = yacc.yacc(debug=debug, write_tables=write_tables, start=startsym, module=sdfyacc, errorlog=errorlog, debuglog=debuglog);
+    if _FAST:
+        debug = False;
+        write_tables = False;
+        errorlog = _NULL_LOGGER;
+        debuglog = _NULL_LOGGER;
+    key = (startsym, debug, write_tables);
+    parser = _PARSER_CACHE.get(key);
+    if parser is None:
+        if errorlog is None:
+            errorlog = _NULL_LOGGER;
+        if debuglog is None and not debug:
+            debuglog = _NULL_LOGGER;
+        # no pickling when `parser.out` or `parsetab.py` is asked for, as PLY
+        # writes neither of them when it uses pickled tables
+        picklefile = None if debug or write_tables else pickle_file(startsym);
+        parser = sdfyacc.load_parser(
+            picklefile, debug=debug, write_tables=write_tables,
+            start=startsym, module=sdfyacc, errorlog=errorlog,
+            debuglog=debuglog)
+        _PARSER_CACHE[key] = parser;
+    sdfyacc.parser = parser;
     sdfparse.init();
 
+# Start symbols of all the grammar elements tested in this module.
+_START_SYMS = (
+    'real_triple', 'real_triple_list', 'interconnect', 'delay_condition',
+    'cond_delay', 'delay_list', 'width_check', 'period_check', 'nochange_check', 'path_constraint', 'iopath',
+    'timing_check', 'delay', 'timingenv', 'cell', 'sdf_header',
+);
+
+# The parser of `sdfyacc`, which `reconfigure` swaps for the tested ones.
+_SDF_PARSER = sdfyacc.parser
+
+# Compiles the parsers of all tested grammar elements upfront, so that any
+# later `reconfigure` only swaps in an already compiled parser.
+def setUpModule():
+    for startsym in _START_SYMS:
+        reconfigure(startsym=startsym, errorlog=_NULL_LOGGER);
+
+# Restores the full SDF parser for the test modules that run next.
+def tearDownModule():
+    sdfyacc.parser = _SDF_PARSER
+    sdfparse.init()
+
 # Alternative implementation of `sdfparse.parse`. This implementation
 # returns the output of PLY's parser (while `sdfparse.parse` compiles
 # a custom structure representing an SDF file structure).
@@ -55,10 +167,37 @@ def reconfigure(debug=False,write_tables=False,startsym=None, errorlog=None, deb
 # output would not match the expected structure of `sdfparse.parse`, which
 # would then return an empty result. Hence we need the output directly
 # from the parser itself.
+#
+# Unlike `sdfparse.parse` this does not reset the lexer state, that is
+# done once by `reconfigure` (the line counter only matters for error
+# messages).
 def parse(input):
-    sdfparse.init()
+    # `input_data` is still needed by the lexer to report error columns
     sdflex.input_data = input
-    return sdfyacc.parser.parse(sdflex.input_data)
+    sdflex.lexer.input(input)
+    return sdfyacc.parser.parse(lexer=sdflex.lexer)
+
+
+# Parses the input like `parse` does, but returns `None` for an input that
+# fails to parse (to check inputs that are expected to be rejected).
+def try_parse(input):
+    try:
+        return parse(input);
+    except Exception:
+        return None;
+
+
+# Returns a (cached) getter of the given tuple of keys.
+@lru_cache(maxsize=None)
+def _keys_getter(keys):
+    return itemgetter(*keys);
+
+# Returns a dictionary with only the given `keys` of `d` (the subset of
+# a parsed result to compare with an expected one).
+def _subset(d, keys):
+    keys = tuple(keys);
+    vals = _keys_getter(keys)(d);
+    return dict(zip(keys, vals if len(keys) > 1 else (vals,)));
 
 
 # Represents a delay value triplet.
@@ -160,24 +299,64 @@ class DelvalList:
         return False;
 
 
-class TestSyntaxElements(unittest.TestCase):
+# Key names of a delay triplet dictionary.
+_DELAY_KEYS = ('min', 'avg', 'max');
 
-    null_logger = None;
+# Compiles a delay dictionary from a triplet value.
+# We use this function for better maintence of changes in the SDF dictionary
+# key names.
+def compile_delay_triplet(triple):
+    return dict(zip(_DELAY_KEYS, triple));
 
-    # Compiles a delay dictionary from a triplet value.
-    # We use this method for better maintence of changes in the SDF dictionary
-    # key names.
-    def compile_delay_triplet(self, triple):
-        return {'min': triple[0], 'avg': triple[1], 'max': triple[2]};
+# Compiles a delay dictionary from a scalar delay value.
+# We use this function for better maintence of changes in the SDF dictionary
+# key names.
+def compile_delay_scalar(scalar):
+    return {'all': scalar};
 
-    # Compiles a delay dictionary from a scalar delay value.
-    # We use this method for better maintence of changes in the SDF dictionary
-    # key names.
-    def compile_delay_scalar(self, scalar):
-        return {'all': scalar};
 
-    def setUp(self):
-        self.null_logger = NullLogger;
+# Common base of the syntax element tests.
+#
+# Test cases that exercise a single grammar element set `START_SYM` to
+# that element. The parser for it is then configured once for the whole
+# test case rather than in every test.
+class SyntaxElementTestCase(unittest.TestCase):
+
+    START_SYM = None;
+
+    @classmethod
+    def setUpClass(cls):
+        reconfigure(startsym=cls.START_SYM, errorlog=_NULL_LOGGER);
+
+
+# `rvalue` test cases as `(input, expected)` pairs.
+_RVALUE_CASES = (
+    ('()', compile_delay_scalar(None)),
+    ('(1:2:3)', compile_delay_triplet([1,2,3])),
+    ('(-1:0:1)', compile_delay_triplet([-1,0,1])),
+    ('(1:2:)', compile_delay_triplet([1,2,None])),
+    ('(1::3)', compile_delay_triplet([1,None,3])),
+    ('(:2:3)', compile_delay_triplet([None,2,3])),
+    ('(1::)', compile_delay_triplet([1,None,None])),
+    ('(:2:)', compile_delay_triplet([None,2,None])),
+    ('(::3)', compile_delay_triplet([None,None,3])),
+    ('(123)', compile_delay_scalar(123)),
+    ('(1.23)', compile_delay_scalar(1.23)),
+);
+
+# Malformed `rvalue` inputs.
+_RVALUE_INVALID_CASES = (
+    '(::)',     # no value at all
+    '1:2:3)',   # missing lpar
+    '(1:2:3',   # missing rpar
+    '(1:23)',   # missing double colon
+    '(12:3)',   # missing double colon
+);
+
+
+class TestRvalue(SyntaxElementTestCase):
+
+    START_SYM = 'real_triple';
 
     #-------------------------------------
     # rvalue
@@ -214,359 +393,128 @@ class TestSyntaxElements(unittest.TestCase):
     #   can be an empty pair of parentheses, each type of delay data can be
     #   annotated or omitted as the need arises.
 
-    def test_rvalue_empty(self):
-        data ='()'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_scalar( None );
-        self.assertEqual( sdf, exp );
+    def test_rvalue(self):
+        for data, exp in _RVALUE_CASES:
+            with self.subTest(data=data):
+                sdf = parse(data);
+                self.assertEqual( sdf, exp );
 
-    def test_rvalue_triple_three_int_1(self):
-        data ='(1:2:3)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_triplet( [1,2,3] );
-        self.assertEqual( sdf, exp );
+    def test_rvalue_invalid(self):
+        for data in _RVALUE_INVALID_CASES:
+            with self.subTest(data=data):
+                self.assertIsNone( try_parse(data) );
 
-    def test_rvalue_triple_three_int_2(self):
-        data ='(-1:0:1)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_triplet( [-1,0,1] );
-        self.assertEqual( sdf, exp );
 
-    def test_rvalue_triple_two_int_1(self):
-        data ='(1:2:)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_triplet( [1,2,None] );
-        self.assertEqual( sdf, exp );
+# Parses all valid `rvalue` cases at once, as a single list of triples.
+class TestRvalueList(SyntaxElementTestCase):
 
-    def test_rvalue_triple_two_int_2(self):
-        data ='(1::3)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_triplet( [1,None,3] );
-        self.assertEqual( sdf, exp );
+    START_SYM = 'real_triple_list';
 
-    def test_rvalue_triple_two_int_3(self):
-        data ='(:2:3)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
+    def test_rvalue_list(self):
+        data = ''.join([case[0] for case in _RVALUE_CASES]);
+        exp = [case[1] for case in _RVALUE_CASES];
         sdf = parse(data);
-        exp = self.compile_delay_triplet( [None,2,3] );
         self.assertEqual( sdf, exp );
 
-    def test_rvalue_triple_one_int_1(self):
-        data ='(1::)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_triplet( [1,None,None] );
-        self.assertEqual( sdf, exp );
 
-    def test_rvalue_triple_one_int_2(self):
-        data ='(:2:)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_triplet( [None,2,None] );
-        self.assertEqual( sdf, exp );
+# Picks the compared fields of an interconnect delay.
+_ICONN = itemgetter('from_pin', 'to_pin', 'type');
 
-    def test_rvalue_triple_one_int_3(self):
-        data ='(::3)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_triplet( [None,None,3] );
-        self.assertEqual( sdf, exp );
+# Malformed `interconnect` inputs.
+_INTERCONNECT_INVALID_CASES = (
+    '(INTERCONNECT a (1:2:3))',     # missing port
+    '(INTERCONNECT (1:2:3))',       # missing ports
+    '(INTERCONNECT a b)',           # missing delay
+    'INTERCONNECT a b (1:2:3))',    # missing lpar
+    '(INTERCONNECT a b (1:2:3)',    # missing rpar
+);
 
-    def test_rvalue_triple_none(self):
-        data ='(::)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_rvalue_triple_missing_lpar(self):
-        data ='1:2:3)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_rvalue_triple_missing_rpar(self):
-        data ='(1:2:3'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_rvalue_triple_missing_doublecolon_1(self):
-        data ='(1:23)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_rvalue_triple_missing_doublecolon_2(self):
-        data ='(12:3)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_rvalue_single_int_1(self):
-        data ='(123)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_scalar(123);
-        self.assertEqual( sdf, exp );
 
-    def test_rvalue_single_float_1(self):
-        data ='(1.23)'
-        reconfigure(startsym='real_triple', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = self.compile_delay_scalar(1.23);
-        self.assertEqual( sdf, exp );
+class TestInterconnect(SyntaxElementTestCase):
+
+    START_SYM = 'interconnect';
 
     #-------------------------------------
     # interconnect delay
     #-------------------------------------
 
-    def test_interconnect_simple_1(self):
-        data ='(INTERCONNECT a b (1:2:3))'
-        reconfigure(startsym='interconnect', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = {'from_pin': 'a', 'to_pin': 'b', 'type': 'interconnect'};
-        act = {k: sdf[k] for k in exp.keys()};
-        self.assertEqual( act, exp );
-        self.assertEqual( DelvalList([1,2,3]), sdf['delay_paths'] );
+    def test_interconnect(self):
+        # (input, (from_pin, to_pin, type), delay_paths)
+        cases = [
+            ('(INTERCONNECT a b (1:2:3))',
+                ('a', 'b', 'interconnect'), DelvalList([1,2,3])),
+            ('(INTERCONNECT a/b/c e/f (1:2:3))',
+                ('a/b/c', 'e/f', 'interconnect'), DelvalList([1,2,3])),
+            ('(INTERCONNECT a b ())',
+                ('a', 'b', 'interconnect'), DelvalList(None)),
+        ];
+        for data, exp, exp_paths in cases:
+            with self.subTest(data=data):
+                sdf = parse(data);
+                self.assertEqual( _ICONN(sdf), exp );
+                self.assertEqual( exp_paths, sdf['delay_paths'] );
 
-    def test_interconnect_simple_2(self):
-        data ='(INTERCONNECT a/b/c e/f (1:2:3))'
-        reconfigure(startsym='interconnect', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = {'from_pin': 'a/b/c', 'to_pin': 'e/f', 'type': 'interconnect'};
-        act = {k: sdf[k] for k in exp.keys()};
-        self.assertEqual( act, exp );
-        self.assertEqual( DelvalList([1,2,3]), sdf['delay_paths'] );
+    def test_interconnect_invalid(self):
+        for data in _INTERCONNECT_INVALID_CASES:
+            with self.subTest(data=data):
+                self.assertIsNone( try_parse(data) );
 
-    def test_interconnect_empty_delay(self):
-        data ='(INTERCONNECT a b ())'
-        reconfigure(startsym='interconnect', errorlog=self.null_logger);
-        sdf = parse(data);
-        exp = {'from_pin': 'a', 'to_pin': 'b', 'type': 'interconnect'};
-        act = {k: sdf[k] for k in exp.keys()};
-        self.assertEqual( act, exp );
-        self.assertEqual( DelvalList(None), sdf['delay_paths'] );
-
-    def test_interconnect_missing_port(self):
-        data ='(INTERCONNECT a (1:2:3))'
-        reconfigure(startsym='interconnect', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_interconnect_missing_ports(self):
-        data ='(INTERCONNECT (1:2:3))'
-        reconfigure(startsym='interconnect', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_interconnect_missing_delay(self):
-        data ='(INTERCONNECT a b)'
-        reconfigure(startsym='interconnect', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_interconnect_missing_lpar(self):
-        data ='INTERCONNECT a b (1:2:3))'
-        reconfigure(startsym='interconnect', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
-
-    def test_interconnect_missing_rpar(self):
-        data ='(INTERCONNECT a b (1:2:3)'
-        reconfigure(startsym='interconnect', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
+
+class TestCondExpr(SyntaxElementTestCase):
+
+    START_SYM = 'delay_condition';
 
     #-------------------------------------
     # conditional port expression
     #-------------------------------------
 
-    def test_cond_path_expr_const_1(self):
-        data ='1\'b0'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['1\'b0'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_2(self):
-        data ='1\'b1'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['1\'b1'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_3(self):
-        data ='1\'B0'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['1\'B0'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_4(self):
-        data ='1\'B1'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['1\'B1'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_5(self):
-        data ='\'b0'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['\'b0'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_6(self):
-        data ='\'b1'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['\'b1'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_7(self):
-        data ='\'B0'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['\'B0'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_8(self):
-        data ='\'B1'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['\'B1'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_9(self):
-        data ='0'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['0'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_const_10(self):
-        data ='1'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['1'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_port_1(self):
-        data ='a'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['a'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_port_2(self):
-        data ='a/b/c'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['a/b/c'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_port_3(self):
-        data ='a.b.c'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['a.b.c'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_unary_const_1(self):
-        data ='~1\'b0'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['~', '1\'b0'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_unary_port_1(self):
-        data ='~a/b/c'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['~', 'a/b/c'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_unary_port_2(self):
-        data ='!x'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['!', 'x'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_binary_1(self):
-        data ='a & b'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['a','&','b'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_binary_2(self):
-        data ='a && 1\'b1'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['a','&&','1\'b1'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_binary_3(self):
-        data ='1\'b0 | b'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['1\'b0','|','b'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_binary_4(self):
-        data ='x || y'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['x','||','y'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_binary_5(self):
-        data ='c.d ^ a/b'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['c.d','^','a/b'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_binary_6(self):
-        data ='A==0'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['A','==','0'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_binary_7(self):
-        data ='A!=C'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['A','!=','C'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_parenthesis_1(self):
-        data ='(A)'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['(','A',')'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_parenthesis_2(self):
-        data ='(1\'b1 && A)'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['(','1\'b1','&&','A',')'];
-        self.assertEqual( act, exp );
-
-    def test_cond_path_expr_parenthesis_3(self):
-        data ='(A&(B|C))'
-        reconfigure(startsym='delay_condition', errorlog=self.null_logger);
-        act = parse(data);
-        exp = ['(','A','&','(','B','|','C',')',')'];
-        self.assertEqual( act, exp );
+    def test_cond_path_expr(self):
+        cases = [
+            # constants
+            ('1\'b0', ['1\'b0']),
+            ('1\'b1', ['1\'b1']),
+            ('1\'B0', ['1\'B0']),
+            ('1\'B1', ['1\'B1']),
+            ('\'b0', ['\'b0']),
+            ('\'b1', ['\'b1']),
+            ('\'B0', ['\'B0']),
+            ('\'B1', ['\'B1']),
+            ('0', ['0']),
+            ('1', ['1']),
+            # ports
+            ('a', ['a']),
+            ('a/b/c', ['a/b/c']),
+            ('a.b.c', ['a.b.c']),
+            # unary operators
+            ('~1\'b0', ['~', '1\'b0']),
+            ('~a/b/c', ['~', 'a/b/c']),
+            ('!x', ['!', 'x']),
+            # binary operators
+            ('a & b', ['a','&','b']),
+            ('a && 1\'b1', ['a','&&','1\'b1']),
+            ('1\'b0 | b', ['1\'b0','|','b']),
+            ('x || y', ['x','||','y']),
+            ('c.d ^ a/b', ['c.d','^','a/b']),
+            ('A==0', ['A','==','0']),
+            ('A!=C', ['A','!=','C']),
+            # parenthesis
+            ('(A)', ['(','A',')']),
+            ('(1\'b1 && A)', ['(','1\'b1','&&','A',')']),
+            ('(A&(B|C))', ['(','A','&','(','B','|','C',')',')']),
+        ];
+        for data, exp in cases:
+            with self.subTest(data=data):
+                act = parse(data);
+                self.assertEqual( act, exp );
+
+
+# Picks the compared fields of a conditional path delay.
+_COND_PATH = itemgetter('from_pin', 'to_pin', 'type', 'is_cond', 'cond_equation');
+
+
+class TestCondDelay(SyntaxElementTestCase):
+
+    START_SYM = 'cond_delay';
 
     #-------------------------------------
     # conditional path delay
@@ -586,29 +534,30 @@ class TestSyntaxElements(unittest.TestCase):
 
     def test_cond_iopath_simple_1(self):
         data ='(COND b (IOPATH a y () ()))'
-        reconfigure(startsym='cond_delay', errorlog=self.null_logger);
         sdf = parse(data);
-        exp = {'from_pin': 'a', 'to_pin': 'y', 'type': 'iopath', 'is_cond': True, 'cond_equation': 'b'};
-        act = {k: sdf[0][k] for k in exp.keys()}; # !!! `sdf` is a list of paths
+        exp = ('a', 'y', 'iopath', True, 'b');
+        act = _COND_PATH(sdf[0]); # !!! `sdf` is a list of paths
         self.assertEqual( act, exp );
 
     def test_cond_iopath_simple_2(self):
         data ='(COND x & ~y (IOPATH a y () ()))'
-        reconfigure(startsym='cond_delay', errorlog=self.null_logger);
         sdf = parse(data);
-        exp = {'from_pin': 'a', 'to_pin': 'y', 'type': 'iopath', 'is_cond': True, 'cond_equation': 'x & ~ y'};
-        act = {k: sdf[0][k] for k in exp.keys()}; # !!! `sdf` is a list of paths
+        exp = ('a', 'y', 'iopath', True, 'x & ~ y');
+        act = _COND_PATH(sdf[0]); # !!! `sdf` is a list of paths
         self.assertEqual( act, exp );
 
     def test_cond_iopath_six_vals(self):
         data = '''(COND PA==1'b0&&PB==1'b1&&PS==1'b1 (IOPATH EN PADM () () (0.661::0.682) (3.513::11.574) (0.945::0.964) (3.176::10.900)))'''
-        reconfigure(startsym='cond_delay', errorlog=self.null_logger);
         sdf = parse(data);
-        exp = {'from_pin': 'EN', 'to_pin': 'PADM', 'type': 'iopath', 'is_cond': True, 'cond_equation': 'PA == 1\'b0 && PB == 1\'b1 && PS == 1\'b1'};
-        act = {k: sdf[0][k] for k in exp.keys()}; # !!! `sdf` is a list of paths
+        exp = ('EN', 'PADM', 'iopath', True, 'PA == 1\'b0 && PB == 1\'b1 && PS == 1\'b1');
+        act = _COND_PATH(sdf[0]); # !!! `sdf` is a list of paths
         self.assertEqual( act, exp );
 
 
+class TestDelayList(SyntaxElementTestCase):
+
+    START_SYM = 'delay_list';
+
     #-------------------------------------
     # delay list
     #-------------------------------------
@@ -618,29 +567,29 @@ class TestSyntaxElements(unittest.TestCase):
         (COND b & a (IOPATH a y () ()))
         (COND a | b (IOPATH a y () ()))
         '''
-        reconfigure(startsym='delay_list', errorlog=self.null_logger);
         sdf = parse(data);
         exp = [
-                {'from_pin': 'a', 'to_pin': 'y', 'type': 'iopath', 'is_cond': True, 'cond_equation': 'b & a'},
-                {'from_pin': 'a', 'to_pin': 'y', 'type': 'iopath', 'is_cond': True, 'cond_equation': 'a | b'}
+                ('a', 'y', 'iopath', True, 'b & a'),
+                ('a', 'y', 'iopath', True, 'a | b')
                 ];
-        act = [];
-        for i in range(0,len(exp)):
-            act.append( {k: sdf[i][k] for k in exp[i].keys()} );
+        act = [_COND_PATH(path) for path in sdf];
         self.assertEqual( act, exp );
 
 
+class TestWidthCheck(SyntaxElementTestCase):
+
+    START_SYM = 'width_check';
+
     #-------------------------------------
     # width check
     #-------------------------------------
 
     def test_tcheck_width_simple(self):
         data ='''(WIDTH clk (4.4:7.5:11.3))''';
-        reconfigure(startsym='width_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'clk', 'to_pin': 'clk', 'type': 'width', 'is_timing_check': True, 'is_cond': False,
                 'from_pin_edge': None, 'to_pin_edge': None};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         self.assertTrue( 'nominal' in sdf['delay_paths'] );
@@ -648,11 +597,10 @@ class TestSyntaxElements(unittest.TestCase):
 
     def test_tcheck_width_port_negedge_spec(self):
         data ='''(WIDTH (negedge clk) (4.4:7.5:11.3))''';
-        reconfigure(startsym='width_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'clk', 'to_pin': 'clk', 'type': 'width', 'is_timing_check': True, 'is_cond': False,
                 'from_pin_edge': 'negedge', 'to_pin_edge': 'negedge'};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         self.assertTrue( 'nominal' in sdf['delay_paths'] );
@@ -660,11 +608,10 @@ class TestSyntaxElements(unittest.TestCase):
 
     def test_tcheck_width_port_posedge_spec(self):
         data ='''(WIDTH (posedge path/to/rst) (11))''';
-        reconfigure(startsym='width_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'path/to/rst', 'to_pin': 'path/to/rst', 'type': 'width', 'is_timing_check': True,
                 'is_cond': False, 'from_pin_edge': 'posedge', 'to_pin_edge': 'posedge'};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         self.assertTrue( 'nominal' in sdf['delay_paths'] );
@@ -672,28 +619,30 @@ class TestSyntaxElements(unittest.TestCase):
 
     def test_tcheck_width_conditional(self):
         data ='''(WIDTH (COND ENABLE (posedge CP)) (1:1:1) )''';
-        reconfigure(startsym='width_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'CP', 'to_pin': 'CP', 'type': 'width', 'is_timing_check': True, 'is_cond': True,
                 'from_pin_edge': 'posedge', 'to_pin_edge': 'posedge', 'cond_equation': 'ENABLE'};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         self.assertTrue( 'nominal' in sdf['delay_paths'] );
         self.assertEqual( Delval(1,1,1), sdf['delay_paths']['nominal'] );
 
 
+class TestPeriodCheck(SyntaxElementTestCase):
+
+    START_SYM = 'period_check';
+
     #-------------------------------------
     # period check
     #-------------------------------------
 
     def test_tcheck_period_simple(self):
         data ='''(PERIOD clk (1::2))''';
-        reconfigure(startsym='period_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'clk', 'to_pin': 'clk', 'type': 'period', 'is_timing_check': True, 'is_cond': False,
                 'from_pin_edge': None, 'to_pin_edge': None};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         self.assertTrue( 'nominal' in sdf['delay_paths'] );
@@ -701,11 +650,10 @@ class TestSyntaxElements(unittest.TestCase):
 
     def test_tcheck_period_conditional(self):
         data ='''(PERIOD (COND a/b==1'b0 && !c (negedge clk)) (1))''';
-        reconfigure(startsym='period_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'clk', 'to_pin': 'clk', 'type': 'period', 'is_timing_check': True, 'is_cond': True,
                 'from_pin_edge': 'negedge', 'to_pin_edge': 'negedge', 'cond_equation': 'a/b == 1\'b0 && ! c'};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         self.assertTrue( 'nominal' in sdf['delay_paths'] );
@@ -713,28 +661,30 @@ class TestSyntaxElements(unittest.TestCase):
 
     def test_tcheck_period_port_posedge_spec(self):
         data ='''(PERIOD (posedge path/to/CK) ())''';
-        reconfigure(startsym='period_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'path/to/CK', 'to_pin': 'path/to/CK', 'type': 'period', 'is_timing_check': True,
                 'is_cond': False, 'from_pin_edge': 'posedge', 'to_pin_edge': 'posedge'};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         self.assertTrue( 'nominal' in sdf['delay_paths'] );
         self.assertEqual( Delval(None), sdf['delay_paths']['nominal'] );
 
 
+class TestNochangeCheck(SyntaxElementTestCase):
+
+    START_SYM = 'nochange_check';
+
     #-------------------------------------
     # nochange check
     #-------------------------------------
 
     def test_tcheck_nochange_simple(self):
         data ='''(NOCHANGE wr addr (:1:) (:2:))''';
-        reconfigure(startsym='nochange_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'addr', 'to_pin': 'wr', 'type': 'nochange', 'is_timing_check': True, 'is_cond': False,
                 'from_pin_edge': None, 'to_pin_edge': None};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay values
         exp = {'setup': Delval(None,1,None), 'hold': Delval(None,2,None)};
@@ -744,11 +694,10 @@ class TestSyntaxElements(unittest.TestCase):
 
     def test_tcheck_nochange_conditional_1st(self):
         data ='''(NOCHANGE (COND 1'b0 por) (posedge rst) (1) (2))''';
-        reconfigure(startsym='nochange_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'rst', 'to_pin': 'por', 'type': 'nochange', 'is_timing_check': True, 'is_cond': True,
                 'from_pin_edge': 'posedge', 'to_pin_edge': None, 'cond_equation': '1\'b0'};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         exp = {'setup': Delval(1), 'hold': Delval(2)};
@@ -758,11 +707,10 @@ class TestSyntaxElements(unittest.TestCase):
 
     def test_tcheck_nochange_conditional_2nd(self):
         data ='''(NOCHANGE (negedge por) (COND a/b&c (posedge rst)) (1) (2))''';
-        reconfigure(startsym='nochange_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'rst', 'to_pin': 'por', 'type': 'nochange', 'is_timing_check': True, 'is_cond': True,
                 'from_pin_edge': 'posedge', 'to_pin_edge': 'negedge', 'cond_equation': 'a/b & c'};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay value
         exp = {'setup': Delval(1), 'hold': Delval(2)};
@@ -771,19 +719,22 @@ class TestSyntaxElements(unittest.TestCase):
             self.assertEqual( v, sdf['delay_paths'][k] );
 
 
+class TestPathConstraint(SyntaxElementTestCase):
+
+    START_SYM = 'path_constraint';
+
     #-------------------------------------
     # pathconstraint
     #-------------------------------------
 
     def test_pathconstraint_simple(self):
         data ='''(PATHCONSTRAINT a y (9:10:11) (12:13:14))'''
-        reconfigure(startsym='path_constraint', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'a', 'to_pin': 'y', 'type': 'pathconstraint',
                 'is_timing_check': False, 'is_timing_env': True,
                 'is_cond': False,'cond_equation': None,
                 'from_pin_edge': None, 'to_pin_edge': None};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         # test delay values
         exp = {'rise': Delval(9,10,11), 'fall': Delval(12,13,14)};
@@ -792,38 +743,44 @@ class TestSyntaxElements(unittest.TestCase):
             self.assertEqual( v, sdf['delay_paths'][k] );
 
 
+class TestIopath(SyntaxElementTestCase):
+
+    START_SYM = 'iopath';
+
     #-------------------------------------
     # iopath
     #-------------------------------------
 
     def test_iopath_simple(self):
         data ='''(IOPATH a y (1:2:3))'''
-        reconfigure(startsym='iopath', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'a', 'to_pin': 'y', 'type': 'iopath',
                 'is_timing_check': False, 'is_timing_env': False,
                 'is_cond': False,'cond_equation': None,
                 'from_pin_edge': None, 'to_pin_edge': None,
                 'has_retain': False};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         self.assertEqual( DelvalList([1,2,3]), sdf['delay_paths'] );
 
     def test_iopath_retain_simple(self):
         data ='''(IOPATH a y (RETAIN (0:1:2)) (1:2:3))'''
-        reconfigure(startsym='iopath', errorlog=self.null_logger);
         sdf = parse(data);
         exp = {'from_pin': 'a', 'to_pin': 'y', 'type': 'iopath',
                 'is_timing_check': False, 'is_timing_env': False,
                 'is_cond': False,'cond_equation': None,
                 'from_pin_edge': None, 'to_pin_edge': None,
                 'has_retain': True};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
         self.assertEqual( DelvalList([1,2,3]), sdf['delay_paths'] );
         self.assertEqual( DelvalList([0,1,2]), sdf['retain_paths'] );
 
 
+class TestTimingCheck(SyntaxElementTestCase):
+
+    START_SYM = 'timing_check';
+
     #-------------------------------------
     # timingcheck
     #-------------------------------------
@@ -835,7 +792,6 @@ class TestSyntaxElements(unittest.TestCase):
         (WIDTH clk (4.4:7.5:11.3))
         )
         '''
-        reconfigure(startsym='timing_check', errorlog=self.null_logger);
         sdf = parse(data);
         exp = [
                 {'from_pin': 'clk', 'to_pin': 'd', 'type': 'setuphold', 'is_cond': False, 'cond_equation': None},
@@ -844,10 +800,14 @@ class TestSyntaxElements(unittest.TestCase):
         act = [];
         self.assertEqual( len(sdf), len(exp) );
         for i in range(0,len(exp)):
-            act.append( {k: sdf[i][k] for k in exp[i].keys()} );
+            act.append( _subset(sdf[i], exp[i].keys()) );
         self.assertEqual( act, exp );
 
 
+class TestDelay(SyntaxElementTestCase):
+
+    START_SYM = 'delay';
+
     #-------------------------------------
     # delay (absolute)
     #-------------------------------------
@@ -857,9 +817,7 @@ class TestSyntaxElements(unittest.TestCase):
     @unittest.expectedFailure
     def test_delay_absolute_empty(self):
         data ='''(DELAY (ABSOLUTE))'''
-        reconfigure(startsym='delay', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
+        self.assertIsNone( try_parse(data) );
 
     def test_delay_absolute_1(self):
         data ='''
@@ -870,7 +828,6 @@ class TestSyntaxElements(unittest.TestCase):
         )
         )
         '''
-        reconfigure(startsym='delay', errorlog=self.null_logger);
         sdf = parse(data);
         exp = [
                 {'from_pin': 'a', 'to_pin': 'y', 'type': 'iopath', 'is_cond': False, 'cond_equation': None},
@@ -879,10 +836,9 @@ class TestSyntaxElements(unittest.TestCase):
         act = [];
         self.assertEqual( len(sdf), len(exp) );
         for i in range(0,len(exp)):
-            act.append( {k: sdf[i][k] for k in exp[i].keys()} );
+            act.append( _subset(sdf[i], exp[i].keys()) );
         self.assertEqual( act, exp );
 
-
     #-------------------------------------
     # delay (incremental)
     #-------------------------------------
@@ -890,10 +846,12 @@ class TestSyntaxElements(unittest.TestCase):
     # empty incremental delay not supported by SDF grammar (as per SDF Std.)
     def test_delay_increment_empty(self):
         data ='''(DELAY (INCREMENT))'''
-        reconfigure(startsym='delay', errorlog=self.null_logger);
-        with self.assertRaises(Exception):
-            sdf = parse(data);
+        self.assertIsNone( try_parse(data) );
+
 
+class TestTimingEnv(SyntaxElementTestCase):
+
+    START_SYM = 'timingenv';
 
     #-------------------------------------
     # timingenv
@@ -904,7 +862,6 @@ class TestSyntaxElements(unittest.TestCase):
         (PATHCONSTRAINT I2.H01 I1.N01 (989:1269:1269) (989:1269:1269))
         (PATHCONSTRAINT I2.H01 I3.N01 (904:1087:1087) (904:1087:1087))
         )'''
-        reconfigure(startsym='timingenv', errorlog=self.null_logger);
         sdf = parse(data);
         exp = [
                 {'from_pin': 'I2.H01', 'to_pin': 'I1.N01',
@@ -915,7 +872,7 @@ class TestSyntaxElements(unittest.TestCase):
         act = [];
         self.assertEqual( len(sdf), len(exp) );
         for i in range(0,len(exp)):
-            act.append( {k: sdf[i][k] for k in exp[i].keys()} );
+            act.append( _subset(sdf[i], exp[i].keys()) );
         self.assertEqual( act, exp );
 
         # test delay values
@@ -929,6 +886,10 @@ class TestSyntaxElements(unittest.TestCase):
                 self.assertEqual( v, sdf[i]['delay_paths'].get(k) );
 
 
+class TestCell(SyntaxElementTestCase):
+
+    START_SYM = 'cell';
+
     #-------------------------------------
     # cell
     #-------------------------------------
@@ -946,13 +907,12 @@ class TestSyntaxElements(unittest.TestCase):
             )
         )
         '''
-        reconfigure(startsym='cell', errorlog=self.null_logger);
         sdf = parse(data);
         self.assertEqual( sdf.keys(), {'cell','inst','delays'} );
 
         # test cell and instance name
         exp = { 'cell':'AND2', 'inst':'top/b/d' };
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
 
         # test delay records
@@ -989,13 +949,12 @@ class TestSyntaxElements(unittest.TestCase):
             )
         )
         '''
-        reconfigure(startsym='cell', errorlog=self.null_logger);
         sdf = parse(data);
         self.assertEqual( sdf.keys(), {'cell','inst','delays'} );
 
         # test cell and instance name
         exp = { 'cell':'AND2', 'inst':'top.b.d' };
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
 
         # test delay records
@@ -1017,6 +976,10 @@ class TestSyntaxElements(unittest.TestCase):
         self.assertEqual( act, exp );
 
 
+class TestHeader(SyntaxElementTestCase):
+
+    START_SYM = 'sdf_header';
+
     #-------------------------------------
     # header
     #-------------------------------------
@@ -1035,7 +998,6 @@ class TestSyntaxElements(unittest.TestCase):
         (TEMPERATURE : 37:)
         (TIMESCALE 10ps)
         '''
-        reconfigure(startsym='sdf_header', errorlog=self.null_logger);
         sdf = parse(data);
         self.assertTrue( type(sdf) is dict );
         exp = {'sdfversion': '3.0', 'design': 'testchip',
@@ -1045,25 +1007,68 @@ class TestSyntaxElements(unittest.TestCase):
                 'voltage': {'min':None, 'avg':3.8, 'max':None},
                 'temperature': {'min':None, 'avg':37, 'max':None}
                 };
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
 
     def test_header_minimal(self):
         data ='''
         (SDFVERSION "3.0")
         '''
-        reconfigure(startsym='sdf_header', errorlog=self.null_logger);
         sdf = parse(data);
         self.assertTrue( type(sdf) is dict );
         exp = {'sdfversion': '3.0'};
-        act = {k: sdf[k] for k in exp.keys()};
+        act = _subset(sdf, exp.keys());
         self.assertEqual( act, exp );
 
         ## import json;
         ## print( json.dumps(sdf, indent=2) );
 
 
+# A damaged pickle file must never make the tests fail, its tables get
+# rebuilt instead.
+class TestPickledTables(unittest.TestCase):
+
+    KWARGS = dict(debug=False, write_tables=False, start='real_triple',
+                  module=sdfyacc, errorlog=_NULL_LOGGER, debuglog=_NULL_LOGGER)
+
+    def test_truncated(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            picklefile = os.path.join(tmpdir, 'parser.pkl')
+            sdfyacc.load_parser(picklefile, **self.KWARGS)
+            size = os.path.getsize(picklefile)
+            with open(picklefile, 'r+b') as f:
+                f.truncate(size // 2)
+
+            parser = sdfyacc.load_parser(picklefile, **self.KWARGS)
+            self.assertEqual(os.path.getsize(picklefile), size)
+            self.assertEqual(os.listdir(tmpdir), ['parser.pkl'])
+
+            sdflex.input_data = '(1:2:3)'
+            sdflex.lexer.input(sdflex.input_data)
+            self.assertEqual(parser.parse(lexer=sdflex.lexer),
+                             compile_delay_triplet([1, 2, 3]))
+
+    # The user cache is used when the in-tree cache directory is not private.
+    # A file there that fails to load is removed even if the tables then
+    # cannot be built either.
+    def test_fallback_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            shared = os.path.join(tmpdir, 'shared')
+            private = os.path.join(tmpdir, 'private')
+            os.makedirs(shared)
+            os.chmod(shared, 0o777)
+            with mock.patch(__name__ + '._PICKLE_DIRS', (shared, private)):
+                picklefile = pickle_file('real_triple')
+            self.assertEqual(picklefile,
+                             os.path.join(private, 'parser_real_triple.pkl'))
+
+            with open(picklefile, 'wb') as f:
+                f.write(b'damaged')
+            with self.assertRaises(sdfyacc.yacc.YaccError):
+                sdfyacc.load_parser(picklefile,
+                                    **dict(self.KWARGS, start='no_such_sym'))
+            self.assertEqual(os.listdir(private), [])
+
 
 if __name__ == '__main__':
     unittest.main()
-
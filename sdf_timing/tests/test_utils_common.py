@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+# Copyright 2022 Tomas Brabec
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# The command-line utilities are not part of the `sdf_timing` package, they
+# are only available in a source tree (where `conftest.py` adds them into
+# PYTHONPATH).
+_UTILS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'utils')
+
+# Running a test module directly (i.e. without pytest and `conftest.py`);
+# add the `sdf_timing` source tree and the utilities into PYTHONPATH.
+if __name__ == '__main__':
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+    sys.path.append(_UTILS_DIR)
+
+if os.path.isdir(_UTILS_DIR):
+    import _common
+    import sdf2json
+else:
+    _common = None
+
+
+# Checks how input files get paired with output files before any of them
+# is processed (possibly by several worker processes at once).
+@unittest.skipIf(_common is None, 'utils/ directory not available')
+class TestGetJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.outdir = self.mkpath('out')
+        os.makedirs(self.outdir)
+        for f in ['a/x.sdf', 'b/x.sdf', 'a/x.sdf.gz']:
+            os.makedirs(os.path.dirname(self.mkpath(f)), exist_ok=True)
+            open(self.mkpath(f), 'w').close()
+
+    def mkpath(self, f):
+        return os.path.join(self.tmpdir.name, f)
+
+    def mkargs(self, **kwargs):
+        args = dict(stdout=False, dir=self.outdir, gzip=False)
+        args.update(kwargs)
+        return argparse.Namespace(**args)
+
+    def test_same_basename(self):
+        files = [self.mkpath('a/x.sdf'), self.mkpath('b/x.sdf')]
+        with self.assertRaisesRegex(ValueError, 'would both be written'):
+            _common.get_jobs(files, self.mkargs(), _common.output_path)
+
+    def test_same_input(self):
+        f = self.mkpath('a/x.sdf')
+        files = [f, self.mkpath('a/./x.sdf'), os.path.relpath(f), f]
+        jobs = _common.get_jobs(files, self.mkargs(), _common.output_path)
+        self.assertEqual(jobs, [(f, os.path.join(self.outdir, 'x.sdf'))])
+
+    def test_json_of_gzipped_input(self):
+        files = [self.mkpath('a/x.sdf'), self.mkpath('a/x.sdf.gz')]
+        with self.assertRaisesRegex(ValueError, 'x.json'):
+            _common.get_jobs(files, self.mkargs(dir=None),
+                             sdf2json.output_path)
+
+    def test_stdout(self):
+        files = [self.mkpath('a/x.sdf'), self.mkpath('b/x.sdf')] * 2
+        jobs = _common.get_jobs(files, self.mkargs(stdout=True),
+                                _common.output_path)
+        self.assertEqual(jobs, [(f, None) for f in files])
+
+
+# Checks reading of the input SDF files, both the memory-mapped regular files
+# and the others.
+@unittest.skipIf(_common is None, 'utils/ directory not available')
+class TestReadInput(unittest.TestCase):
+
+    DATA = '(DELAYFILE\r\n  (SDFVERSION "3.0")\r(DESIGN "x")\n)\n'
+    TEXT = '(DELAYFILE\n  (SDFVERSION "3.0")\n(DESIGN "x")\n)\n'
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'x.sdf')
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data.encode('utf-8'))
+
+    def test_empty(self):
+        self.write('')
+        self.assertEqual(_common.read_input(self.path), '')
+
+    def test_newlines(self):
+        self.write(self.DATA)
+        self.assertEqual(_common.read_input(self.path), self.TEXT)
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'no named pipes')
+    def test_fifo(self):
+        os.mkfifo(self.path)
+        # a daemon, as it blocks until the pipe gets opened for reading
+        writer = threading.Thread(target=self.write, args=(self.DATA,),
+                                  daemon=True)
+        writer.start()
+        self.assertEqual(_common.read_input(self.path), self.TEXT)
+        writer.join()
+
+
+# A minimal SDF file.
+_SDF = '(DELAYFILE (SDFVERSION "3.0"))\n'
+
+
+# Writes a part of the output and then fails, like an interrupted write.
+def _write_partial(sdf, outfile, args):
+    outfile.write('(DELAYFILE\n')
+    raise RuntimeError('write failed')
+
+
+# Checks that the failures of some files neither stop the others nor leave
+# partial outputs behind.
+@unittest.skipIf(_common is None, 'utils/ directory not available')
+class TestProcessAll(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for name, data in [('a.sdf', _SDF), ('b.sdf', _SDF),
+                           ('bad.sdf', '(DELAYFILE (BROKEN')]:
+            with open(self.mkpath(name), 'w') as f:
+                f.write(data)
+
+    def mkpath(self, f):
+        return os.path.join(self.tmpdir.name, f)
+
+    def mkargs(self, **kwargs):
+        args = dict(stdout=False, dir=None, gzip=False, force=False,
+                    indent=2, orjson=False)
+        args.update(kwargs)
+        return argparse.Namespace(**args)
+
+    def run_jobs(self, names, args, write, binary=False):
+        files = [self.mkpath(name) for name in names]
+        jobs = _common.get_jobs(files, args, sdf2json.output_path)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            with self.assertRaises(SystemExit) as cm:
+                _common.process_all(jobs, args, write, binary)
+        return cm.exception, stderr.getvalue()
+
+    def test_failed_file(self):
+        error, log = self.run_jobs(['a.sdf', 'bad.sdf', 'b.sdf'],
+                                   self.mkargs(), sdf2json.write, True)
+        self.assertEqual(str(error), '1 of 3 files failed')
+        self.assertIn('Failed to process %s' % self.mkpath('bad.sdf'), log)
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)),
+                         ['a.json', 'a.sdf', 'b.json', 'b.sdf', 'bad.sdf'])
+
+    def test_interrupted_write(self):
+        for gzip in [False, True]:
+            with self.subTest(gzip=gzip):
+                error, log = self.run_jobs(
+                    ['a.sdf'], self.mkargs(gzip=gzip), _write_partial)
+                self.assertIn('write failed', log)
+                self.assertEqual(sorted(os.listdir(self.tmpdir.name)),
+                                 ['a.sdf', 'b.sdf', 'bad.sdf'])
+
+
+# Checks when an existing output file gets rewritten.
+@unittest.skipIf(_common is None, 'utils/ directory not available')
+class TestUpToDate(unittest.TestCase):
+
+    OLD = b'{"old": true}'
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.f = os.path.join(self.tmpdir.name, 'x.sdf')
+        self.of = os.path.join(self.tmpdir.name, 'x.json')
+        with open(self.f, 'w') as f:
+            f.write(_SDF)
+        with open(self.of, 'wb') as f:
+            f.write(self.OLD)
+
+    # Sets the modification times of the input and the output file.
+    def touch(self, f_mtime, of_mtime):
+        os.utime(self.f, (f_mtime, f_mtime))
+        os.utime(self.of, (of_mtime, of_mtime))
+
+    # Processes the input file, returns the output and the log.
+    def process(self, force=False):
+        args = argparse.Namespace(stdout=False, dir=None, gzip=False,
+                                  force=force, indent=2, orjson=False)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            _common.process(self.f, self.of, args, sdf2json.write, True)
+        with open(self.of, 'rb') as f:
+            return f.read(), stderr.getvalue()
+
+    def test_up_to_date(self):
+        for of_mtime in [200, 100]:
+            with self.subTest(of_mtime=of_mtime):
+                self.touch(100, of_mtime)
+                data, log = self.process()
+                self.assertEqual(data, self.OLD)
+                self.assertIn('File is up-to-date', log)
+                self.assertNotIn('Reading', log)
+
+    def test_stale(self):
+        self.touch(200, 100)
+        data, log = self.process()
+        self.assertEqual(json.loads(data), {'header': {'sdfversion': '3.0'}})
+        self.assertGreater(os.path.getmtime(self.of), 200)
+
+    def test_force(self):
+        self.touch(100, 200)
+        data, log = self.process(force=True)
+        self.assertEqual(json.loads(data), {'header': {'sdfversion': '3.0'}})
+        self.assertNotIn('File is up-to-date', log)
+
+
+# Checks the selection of input files, on the command line and by a list.
+@unittest.skipIf(_common is None, 'utils/ directory not available')
+class TestInputFiles(unittest.TestCase):
+
+    LIST = 'a.sdf\n\n  \nb.sdf  \r\n'
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.listfile = os.path.join(self.tmpdir.name, 'files.txt')
+        with open(self.listfile, 'w', newline='') as f:
+            f.write(self.LIST)
+
+    # Returns the input files selected by the command-line `argv`.
+    def get_input_files(self, argv):
+        opt_parser = argparse.ArgumentParser()
+        _common.add_input_arguments(opt_parser)
+        args = opt_parser.parse_args(argv)
+        return _common.get_input_files(opt_parser, args)
+
+    def test_files(self):
+        self.assertEqual(self.get_input_files(['a.sdf', 'b.sdf']),
+                         ['a.sdf', 'b.sdf'])
+
+    def test_files_from(self):
+        self.assertEqual(self.get_input_files(['--files-from', self.listfile]),
+                         ['a.sdf', 'b.sdf'])
+
+    def test_files_from_stdin(self):
+        with mock.patch('sys.stdin', io.StringIO(self.LIST)):
+            self.assertEqual(self.get_input_files(['--files-from', '-']),
+                             ['a.sdf', 'b.sdf'])
+
+    def test_merged(self):
+        argv = ['--files-from', self.listfile, 'c.sdf', 'd.sdf']
+        self.assertEqual(self.get_input_files(argv),
+                         ['c.sdf', 'd.sdf', 'a.sdf', 'b.sdf'])
+
+    def test_no_input(self):
+        with open(self.listfile, 'w') as f:
+            f.write('\n  \n')
+        for argv in [[], ['--files-from', self.listfile]]:
+            with self.subTest(argv=argv):
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr):
+                    with self.assertRaises(SystemExit):
+                        self.get_input_files(argv)
+                self.assertIn('no input files given', stderr.getvalue())
+
+
+# Checks the JSON file names and the `--orjson` option of `sdf2json`.
+@unittest.skipIf(_common is None, 'utils/ directory not available')
+class TestSdf2Json(unittest.TestCase):
+
+    def test_split_path_sufixes(self):
+        for path, exp in [
+                ('dir/a.b.sdf', ('dir/a', ['b', 'sdf'])),
+                ('a', ('a', [])),
+                ('dir/.a.sdf', ('dir/.a', ['sdf']))]:
+            with self.subTest(path=path):
+                self.assertEqual(sdf2json.split_path_sufixes(path), exp)
+
+    def test_output_path(self):
+        for f, kwargs, exp in [
+                ('d/x.sdf', {}, 'd/x.json'),
+                ('d/x.sdf.gz', {}, 'd/x.json'),
+                ('d/x.b.sdf', {}, 'd/x.b.json'),
+                ('d/x.txt', {}, 'd/x.txt.json'),
+                ('d/x.sdf.gz', {'dir': 'o'}, os.path.join('o', 'x.json')),
+                ('d/x.sdf', {'gzip': True}, 'd/x.json.gz')]:
+            with self.subTest(f=f, **kwargs):
+                args = argparse.Namespace(**dict(dict(dir=None, gzip=False),
+                                                 **kwargs))
+                self.assertEqual(sdf2json.output_path(f, args), exp)
+
+    # Runs `sdf2json` with the command-line `argv`, which is expected to be
+    # rejected, and returns the error message.
+    def main_error(self, argv):
+        stderr = io.StringIO()
+        with mock.patch('sys.argv', ['sdf2json.py'] + argv), \
+                contextlib.redirect_stderr(stderr), \
+                self.assertRaises(SystemExit):
+            sdf2json.main()
+        return stderr.getvalue()
+
+    def test_orjson_indent(self):
+        self.assertIn('--orjson supports only --indent 2',
+                      self.main_error(['--orjson', '--indent', '4', 'x.sdf']))
+
+    def test_orjson_missing(self):
+        with mock.patch('importlib.util.find_spec', return_value=None):
+            self.assertIn('--orjson requires the orjson package',
+                          self.main_error(['--orjson', 'x.sdf']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+# Copyright 2022 Tomas Brabec
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+# Helpers shared by the command-line utilities in this directory. Nothing
+# here imports `sdf_timing` upfront, loading the parser is left to the point
+# where an input actually gets parsed.
+
+import functools
+import io
+import mmap
+import multiprocessing
+import os
+import stat
+import sys
+import traceback
+
+
+# Reads the whole SDF file `f`. Non-empty regular files are memory-mapped
+# and decoded in one go, which saves the intermediate buffers of a text-mode
+# read(). Anything else (e.g. a pipe, whose size is not known upfront) is
+# read as a text file.
+def read_input(f):
+    if f.endswith('gz'):
+        import gzip
+        with gzip.open(f, 'rt') as sdffile:
+            return sdffile.read()
+
+    st = os.stat(f)
+    if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+        with open(f, encoding='utf-8', newline=None) as sdffile:
+            return sdffile.read()
+
+    with open(f, 'rb') as sdffile:
+        with mmap.mmap(sdffile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = str(mm, 'utf-8')
+    # keep the newline translation of text mode
+    if '\r' in data:
+        data = data.replace('\r\n', '\n').replace('\r', '\n')
+    return data
+
+
+# Reads the newline separated list of files from `path` ('-' for standard
+# input). The names are stripped of surrounding whitespace, blank lines are
+# ignored.
+def read_file_list(path):
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path) as listfile:
+            lines = listfile.read().splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+# Adds the arguments selecting the input SDF files to `opt_parser`.
+def add_input_arguments(opt_parser):
+    opt_parser.add_argument(
+        '--files-from', type=str, default=None, metavar='<path>',
+        help='Reads the list of SDF files to parse from a file, one per'
+             ' line (use - for standard input).')
+    opt_parser.add_argument(
+        'files', nargs='*', metavar='file',
+        help='List of SDF files to parse.')
+
+
+# Returns the input files given by the parsed command-line `args`, reporting
+# an error through `opt_parser` if there are none.
+def get_input_files(opt_parser, args):
+    files = list(args.files)
+    if args.files_from is not None:
+        files += read_file_list(args.files_from)
+    if not files:
+        opt_parser.error('no input files given')
+    return files
+
+
+# Returns the path of the file written for the input SDF file `f` into the
+# `--dir` directory (with a '.gz' suffix when compressed by `--gzip`).
+def output_path(f, args):
+    of = os.path.join(args.dir, os.path.basename(f))
+    if args.gzip:
+        of += '.gz'
+    return of
+
+
+# Pairs every input file with its output file, as given by
+# `output_path(f, args)`, or with None when printing to standard output.
+# An input given more than once (under any name) is kept only once.
+# Distinct inputs that would be written into the same output file raise
+# ValueError, as one would overwrite the other.
+def get_jobs(files, args, output_path):
+    if args.stdout:
+        return [(f, None) for f in files]
+
+    jobs = []
+    writers = {}
+    for f in files:
+        of = output_path(f, args)
+        real_of = os.path.realpath(of)
+        other = writers.get(real_of)
+        if other is None:
+            writers[real_of] = f
+            jobs.append((f, of))
+        elif os.path.realpath(other) != os.path.realpath(f):
+            raise ValueError("'%s' and '%s' would both be written to '%s'"
+                             % (other, f, of))
+    return jobs
+
+
+# Returns the stream through which the output file `of` gets written into the
+# binary file `rawfile`, compressed if asked for by `--gzip`. The stream is
+# binary if `binary`, and text otherwise.
+def open_output(rawfile, of, args, binary=False):
+    if args.gzip:
+        import gzip
+        # the name stored in the gzip header is that of the output file
+        rawfile = gzip.GzipFile(of, 'wb', fileobj=rawfile)
+    return rawfile if binary else io.TextIOWrapper(rawfile)
+
+
+# Removes the file `path` if there is one.
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Converts a single SDF file `f` into the file `of` (or to standard output if
+# None) as requested by the command-line `args`. The parsed SDF is written
+# by `write(sdf, outfile, args)`, where `outfile` is the stream opened by
+# `open_output` (or None for standard output).
+#
+# The output is written into a temporary file first, which replaces `of`
+# only once complete. Hence a failed or interrupted write never leaves
+# behind a partial output that a later run would skip as up-to-date.
+def process(f, of, args, write, binary=False):
+    if not os.path.exists(f):
+        print("Does not exists: '%s'" % f, file=sys.stderr)
+        return
+
+    # the output is checked before parsing so that up-to-date files are
+    # skipped without the cost of reading them
+    if of is not None and os.path.exists(of) and not args.force and \
+            os.path.getmtime(of) >= os.path.getmtime(f):
+        print("File is up-to-date, not writing: %s" % of, file=sys.stderr)
+        return
+
+    # imported only here as loading the parser tables is costly and not
+    # needed for `--help` or invalid arguments
+    from sdf_timing import sdfparse
+
+    print("Reading %s ..." % f, file=sys.stderr)
+    sdf = sdfparse.parse(read_input(f))
+
+    if sdf is not None:
+        if of is not None:
+            print("Writing %s ..." % of, file=sys.stderr)
+            tmpfile = of + '.tmp'
+            try:
+                with open(tmpfile, 'wb', buffering=1 << 20) as rawfile, \
+                        open_output(rawfile, of, args, binary) as outfile:
+                    write(sdf, outfile, args)
+                os.replace(tmpfile, of)
+            except BaseException:
+                _remove(tmpfile)
+                raise
+        else:
+            write(sdf, None, args)
+
+
+# Runs `process` for a single `(f, of)` job. Returns None on success, or
+# the input file and the error traceback if it failed.
+def _run_job(job, args, write, binary):
+    try:
+        process(job[0], job[1], args, write, binary)
+    except Exception:
+        return (job[0], traceback.format_exc())
+    return None
+
+
+# Runs `process` with the `write` function (see there) for all the `jobs`
+# (see `get_jobs`), in parallel unless printing to standard output (which
+# needs to keep the order of files). A failed file does not stop the others,
+# all the failures are reported at the end and then exit the program.
+def process_all(jobs, args, write, binary=False):
+    run = functools.partial(_run_job, args=args, write=write, binary=binary)
+    if args.stdout or len(jobs) < 2:
+        results = [run(job) for job in jobs]
+    else:
+        nproc = min(len(jobs), os.cpu_count() or 1)
+        with multiprocessing.Pool(nproc) as pool:
+            results = list(pool.imap_unordered(run, jobs))
+
+    failed = [result for result in results if result is not None]
+    for f, error in failed:
+        print("Failed to process %s:\n%s" % (f, error), file=sys.stderr)
+    if failed:
+        sys.exit('%d of %d files failed' % (len(failed), len(jobs)))
@@ -21,69 +21,56 @@ import sys
 import os
 import os.path
 import argparse
-from sdf_timing import sdfparse, sdfwrite
 
-# Define command-line API
-opt_parser = argparse.ArgumentParser(
-        description='Reads input SDFs and writes out back into SDFs in a target directory.'
-        );
-opt_parser.add_argument('--dir', type=str, default='.',
-        help='Path to a directory where to write out parsed SDFs.', metavar='<path>'
-        );
-opt_parser.add_argument('--stdout', default=False, action='store_true',
-        help='Print to standard output instead to a file.'
-        );
-opt_parser.add_argument('--force', default=False, action='store_true',
-        help='Overwrites the output file if already exists.'
-        );
-opt_parser.add_argument('--gzip', default=False, action='store_true',
-        help='Compresses the output file with gzip. Ignored when using --stdout.'
-        );
-opt_parser.add_argument('--indent', type=int, default=2, metavar='N',
-        help='Number of spaces for indentation.'
-        );
-opt_parser.add_argument('files', nargs='+', metavar='file',
-        help='List of SDF files to parse.'
-        );
+import _common
 
-# parse command line arguments
-args = opt_parser.parse_args();
 
+# Writes the parsed `sdf` back as SDF into `outfile` (standard output if
+# None).
+def write(sdf, outfile, args):
+    # imported only here, like the parser in `_common.process`
+    from sdf_timing import sdfwrite
+    sdfwrite.print_sdf(sdf, indent=args.indent * ' ', channel=outfile)
 
-if not os.path.isdir(args.dir):
-    print("Not a directory: " + str(args.dir), file=sys.stderr);
-else:
-    for f in args.files:
-        if not os.path.exists(f):
-            print("Does not exists: '%s'" % f, file=sys.stderr);
-        else:
-            sdf = None;
-            print("Reading %s ..." % f, file=sys.stderr);
-            if f.endswith('gz'):
-                import gzip;
-                with gzip.open(f,'rt') as sdffile:
-                    sdf = sdfparse.parse(sdffile.read())
-            else:
-                with open(f) as sdffile:
-                    sdf = sdfparse.parse(sdffile.read())
 
-            if sdf is not None:
-                if not args.stdout:
-                    of = os.path.join(args.dir, os.path.basename(f));
-                    if args.gzip: of += '.gz';
+def main():
+    # Define command-line API
+    opt_parser = argparse.ArgumentParser(
+        description='Reads input SDFs and writes out back into SDFs in a'
+                    ' target directory.')
+    opt_parser.add_argument(
+        '--dir', type=str, default='.', metavar='<path>',
+        help='Path to a directory where to write out parsed SDFs.')
+    opt_parser.add_argument(
+        '--stdout', default=False, action='store_true',
+        help='Print to standard output instead to a file.')
+    opt_parser.add_argument(
+        '--force', default=False, action='store_true',
+        help='Overwrites the output file even if it is newer than the input'
+             ' file.')
+    opt_parser.add_argument(
+        '--gzip', default=False, action='store_true',
+        help='Compresses the output file with gzip. Ignored when using'
+             ' --stdout.')
+    opt_parser.add_argument(
+        '--indent', type=int, default=2, metavar='N',
+        help='Number of spaces for indentation.')
+    _common.add_input_arguments(opt_parser)
 
-                    if os.path.exists(of) and not args.force:
-                        print("File already exists, not writing: %s" % of, file=sys.stderr);
-                        continue;
+    # parse command line arguments
+    args = opt_parser.parse_args()
 
-                    print("Writing %s ..." % of, file=sys.stderr);
-                    if args.gzip:
-                        import gzip;
-                        with gzip.open(of,'wt') as outfile:
-                            sdfwrite.print_sdf(sdf, indent=args.indent*' ', channel=outfile)
-                    else:
-                        with open(of,'w') as outfile:
-                            sdfwrite.print_sdf(sdf, indent=args.indent*' ', channel=outfile)
-                else:
-                    sdfwrite.print_sdf(sdf, indent=args.indent*' ')
+    files = _common.get_input_files(opt_parser, args)
 
+    if not os.path.isdir(args.dir):
+        print("Not a directory: " + str(args.dir), file=sys.stderr)
+    else:
+        try:
+            jobs = _common.get_jobs(files, args, _common.output_path)
+        except ValueError as e:
+            opt_parser.error(str(e))
+        _common.process_all(jobs, args, write)
+
+
+if __name__ == '__main__':
+    main()
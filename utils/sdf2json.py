@@ -21,98 +21,120 @@ import sys
 import os
 import os.path
 import argparse
+import importlib.util
+import io
 import json
-from sdf_timing import sdfparse
-
-def get_path_sufixes(path):
-    sufixes = []
-    [path,sufix] = os.path.splitext(path)
-    while sufix:
-        sufixes.insert(0,sufix[1:])
-        [path,sufix] = os.path.splitext(path)
-    return sufixes
-
-def get_path_noextname(path):
-    sufixes = []
-    [path,sufix] = os.path.splitext(path)
-    while sufix:
-        sufixes.insert(0,sufix[1:])
-        [path,sufix] = os.path.splitext(path)
-    return path
-
-# Define command-line API
-opt_parser = argparse.ArgumentParser(description='Converts SDFs into JSON data format.')
-opt_parser.add_argument('--dir', type=str, default=None,
-        help='Path to a directory where to write out converted JSON file (unless --stdout).' + \
-                ' Defaults to the same folder as the input file so that JSON file lies next to the input SDF file.', metavar='<path>'
-        );
-opt_parser.add_argument('--stdout', default=False, action='store_true',
-        help='Print to standard output instead to a file.'
-        );
-opt_parser.add_argument('--force', default=False, action='store_true',
-        help='Overwrites the output file if already exists.'
-        );
-opt_parser.add_argument('--gzip', default=False, action='store_true',
-        help='Compresses the output file with gzip. Ignored when using --stdout.'
-        );
-opt_parser.add_argument('--indent', type=int, default=2, metavar='N',
-        help='Number of spaces for indentation.'
-        );
-opt_parser.add_argument('files', nargs='+', metavar='file',
-        help='List of SDF files to parse.'
-        );
-
-# parse command line arguments
-args = opt_parser.parse_args();
-
-
-if args.dir is not None and not os.path.isdir(args.dir):
-    print("Not a directory: " + str(args.dir), file=sys.stderr);
-else:
-    for f in args.files:
-        if not os.path.exists(f):
-            print("Does not exists: '%s'" % f, file=sys.stderr);
-        else:
-            sdf = None;
-            print("Reading %s ..." % f, file=sys.stderr);
-            if f.endswith('gz'):
-                import gzip;
-                with gzip.open(f,'rt') as sdffile:
-                    sdf = sdfparse.parse(sdffile.read())
-            else:
-                with open(f) as sdffile:
-                    sdf = sdfparse.parse(sdffile.read())
-
-            if sdf is not None:
-                if not args.stdout:
-                    exts = get_path_sufixes(f);
-                    of = get_path_noextname(f);
-
-                    if exts[-1] == 'gz': del exts[-1];
-                    if exts[-1] == 'sdf': del exts[-1];
-
-                    while len(exts) > 0:
-                        of += '.' + exts.pop(0);
-
-                    of += '.json';
-
-                    if args.dir is not None:
-                        of = os.path.join(args.dir, os.path.basename(of));
-
-                    if args.gzip: of += '.gz';
-
-                    if os.path.exists(of) and not args.force:
-                        print("File already exists, not writing: %s" % of, file=sys.stderr);
-                        continue;
-
-                    print("Writing %s ..." % of, file=sys.stderr);
-                    if args.gzip:
-                        import gzip;
-                        with gzip.open(of,'wt') as outfile:
-                            json.dump(sdf, outfile, indent=args.indent)
-                    else:
-                        with open(of,'w') as outfile:
-                            json.dump(sdf, outfile, indent=args.indent)
-                else:
-                    json.dump(sdf, sys.stdout, indent=args.indent)
 
+import _common
+
+
+# Splits `path` into the path without any suffixes and the list of the
+# suffixes, e.g. 'dir/a.b.sdf' -> ('dir/a', ['b', 'sdf']).
+def split_path_sufixes(path):
+    base = os.path.basename(path)
+    stem = base.lstrip('.')
+    [name, *sufixes] = stem.split('.')
+    return (path[:len(path) - len(stem)] + name, sufixes)
+
+
+# Writes `sdf` as JSON into the binary stream `outfile`. The standard `json`
+# encoder is the reference; the faster orjson encoder is only used if asked
+# for by `use_orjson` (and then only supports an indentation of 2).
+def dump_json(sdf, outfile, indent, use_orjson=False):
+    if use_orjson:
+        import orjson
+        outfile.write(orjson.dumps(sdf, option=orjson.OPT_INDENT_2))
+    else:
+        textfile = io.TextIOWrapper(outfile, encoding='utf-8')
+        json.dump(sdf, textfile, indent=indent)
+        textfile.flush()
+        textfile.detach()
+
+
+# Returns the path of the JSON file written for the input SDF file `f`.
+def output_path(f, args):
+    [of, exts] = split_path_sufixes(f)
+
+    if exts and exts[-1] == 'gz':
+        del exts[-1]
+    if exts and exts[-1] == 'sdf':
+        del exts[-1]
+
+    for ext in exts:
+        of += '.' + ext
+
+    of += '.json'
+
+    if args.dir is not None:
+        of = os.path.join(args.dir, os.path.basename(of))
+
+    if args.gzip:
+        of += '.gz'
+    return of
+
+
+# Writes the parsed `sdf` as JSON into the binary stream `outfile` (standard
+# output if None).
+def write(sdf, outfile, args):
+    if outfile is not None:
+        dump_json(sdf, outfile, args.indent, args.orjson)
+    else:
+        sys.stdout.flush()
+        dump_json(sdf, sys.stdout.buffer, args.indent, args.orjson)
+        sys.stdout.buffer.flush()
+
+
+def main():
+    # Define command-line API
+    opt_parser = argparse.ArgumentParser(
+        description='Converts SDFs into JSON data format.')
+    opt_parser.add_argument(
+        '--dir', type=str, default=None, metavar='<path>',
+        help='Path to a directory where to write out converted JSON file'
+             ' (unless --stdout). Defaults to the same folder as the input'
+             ' file so that JSON file lies next to the input SDF file.')
+    opt_parser.add_argument(
+        '--stdout', default=False, action='store_true',
+        help='Print to standard output instead to a file.')
+    opt_parser.add_argument(
+        '--force', default=False, action='store_true',
+        help='Overwrites the output file even if it is newer than the input'
+             ' file.')
+    opt_parser.add_argument(
+        '--gzip', default=False, action='store_true',
+        help='Compresses the output file with gzip. Ignored when using'
+             ' --stdout.')
+    opt_parser.add_argument(
+        '--indent', type=int, default=2, metavar='N',
+        help='Number of spaces for indentation.')
+    opt_parser.add_argument(
+        '--orjson', default=False, action='store_true',
+        help='Uses the faster orjson encoder (requires the orjson package'
+             ' and --indent 2). Unlike the default encoder it writes'
+             ' non-ASCII characters unescaped, NaN and Infinity as null and'
+             ' may format floats differently.')
+    _common.add_input_arguments(opt_parser)
+
+    # parse command line arguments
+    args = opt_parser.parse_args()
+
+    files = _common.get_input_files(opt_parser, args)
+
+    if args.orjson:
+        if args.indent != 2:
+            opt_parser.error('--orjson supports only --indent 2')
+        if importlib.util.find_spec('orjson') is None:
+            opt_parser.error('--orjson requires the orjson package')
+
+    if args.dir is not None and not os.path.isdir(args.dir):
+        print("Not a directory: " + str(args.dir), file=sys.stderr)
+    else:
+        try:
+            jobs = _common.get_jobs(files, args, output_path)
+        except ValueError as e:
+            opt_parser.error(str(e))
+        _common.process_all(jobs, args, write, binary=True)
+
+
+if __name__ == '__main__':
+    main()